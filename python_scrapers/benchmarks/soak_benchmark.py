@@ -0,0 +1,177 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIKES = 1234
+TIMESTAMP = '2026-01-01T10:00:00Z'
+
+COMMENT = '''<li class="comments-comment-item">
+    <span class="comments-comment-item__commenter-name">user{i}</span>
+    <div class="comments-comment-item-content-body">Great talk, see you next year! #event{i}</div>
+</li>'''
+
+# LinkedIn post markup, so the real scraper and its selectors do the work.
+FIXTURE = f'''<!doctype html>
+<html>
+<head><title>Fixture post</title></head>
+<body>
+<article data-urn="urn:li:activity:1">
+    <h1 class="feed-shared-actor__name">Closing keynote</h1>
+    <time datetime="{TIMESTAMP}">Jan 1</time>
+    <div class="feed-shared-text">Thanks everyone for coming to the conference.</div>
+    <span class="social-details-social-counts__reactions-count">{LIKES:,}</span>
+    <ul>{''.join(COMMENT.format(i=i) for i in range(500))}</ul>
+</article>
+<script>
+    // Listeners and detached DOM that only a properly closed page releases.
+    window.cache = Array.from({{length: 2000}}, (_, i) => document.createElement('div'));
+    window.addEventListener('scroll', () => window.cache.length);
+</script>
+</body>
+</html>'''.encode('utf-8')
+
+
+PROFILE_POSTS = 5
+
+# LinkedIn profile markup linking to fixture posts, for scrape_profile.
+PROFILE = f'''<!doctype html>
+<html>
+<head><title>Fixture profile</title></head>
+<body>
+<h1>Fixture Org</h1>
+{''.join(f'<div data-urn="urn:li:activity:{i}"><a href="/posts/soak-profile-{i}">Post {i}</a></div>' for i in range(PROFILE_POSTS))}
+</body>
+</html>'''.encode('utf-8')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PROFILE if self.path.startswith('/in/') else FIXTURE
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixture():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def quarter_median(samples, key, last=False):
+    quarter = max(len(samples) // 4, 1)
+    window = samples[-quarter:] if last else samples[:quarter]
+    return statistics.median(sample[key] for sample in window)
+
+
+def check(post):
+    # Returns what the scraper got wrong, so a soak that only measures
+    # memory cannot pass while every page comes back empty.
+    if 'error' in post:
+        return post['error']
+    expected = {'likes': LIKES, 'timestamp': TIMESTAMP, 'author': 'Closing keynote'}
+    wrong = [f'{key}={post.get(key)!r}' for key, value in expected.items() if post.get(key) != value]
+    if not post.get('post_text'):
+        wrong.append('post_text empty')
+    if len(post.get('comments', [])) != 30:
+        wrong.append(f'{len(post.get("comments", []))} comments')
+    return ', '.join(wrong) or None
+
+
+def check_profile(profile):
+    if 'error' in profile:
+        return profile['error']
+    if len(profile.get('posts', [])) != PROFILE_POSTS:
+        return f'profile returned {len(profile.get("posts", []))} of {PROFILE_POSTS} posts'
+    return next(filter(None, map(check, profile['posts'])), None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape a local fixture repeatedly and check that memory stays flat')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--sample-every', type=int, default=100)
+    parser.add_argument('--max-growth-mb', type=float, default=50)
+    parser.add_argument('--max-fd-growth', type=int, default=20)
+    parser.add_argument('--profile-every', type=int, default=100,
+                        help='also scrape a fixture profile and its posts every N iterations')
+    parser.add_argument('--settle-seconds', type=float, default=0,
+                        help='pause after each navigation; the scrapers default to 3s for live sites')
+    args = parser.parse_args()
+
+    # Profiles go to a scratch directory so the soak never touches real state.
+    os.environ.setdefault('SCRAPER_STATE_DIR', tempfile.mkdtemp(prefix='soak-state-'))
+    os.environ['SCRAPER_SETTLE_SECONDS'] = str(args.settle_seconds)
+    sys.path.insert(0, API_DIR)
+    from scrapers.linkedin_scraper import LinkedInScraper
+    from utils.lifecycle import lifecycle
+
+    server, base_url = serve_fixture()
+    scraper = LinkedInScraper()
+    baseline = lifecycle.snapshot()
+    samples = []
+    errors = {}
+
+    print(f'{"iteration":>9} {"worker MB":>10} {"chromium":>9} {"chromium MB":>12} {"fds":>5} {"contexts":>9} {"pages":>6}')
+    try:
+        for iteration in range(1, args.iterations + 1):
+            problem = check(scraper.scrape_post(f'{base_url}/posts/soak-{iteration}'))
+            if problem:
+                errors[problem] = errors.get(problem, 0) + 1
+            if args.profile_every and iteration % args.profile_every == 0:
+                problem = check_profile(scraper.scrape_profile(f'{base_url}/in/soak', max_posts=PROFILE_POSTS))
+                if problem:
+                    errors[f'profile: {problem}'] = errors.get(f'profile: {problem}', 0) + 1
+
+            if iteration % args.sample_every == 0:
+                snapshot = lifecycle.snapshot()
+                memory, handles = snapshot['memory'] or {}, snapshot['open']
+                samples.append({
+                    'worker': memory.get('worker_rss_mb', 0),
+                    'total': memory.get('total_rss_mb', 0),
+                    'fds': handles.get('file_descriptors', 0)
+                })
+                print(f'{iteration:>9} {memory.get("worker_rss_mb", 0):>10} {memory.get("chromium_processes", 0):>9} '
+                      f'{memory.get("chromium_rss_mb", 0):>12} {handles.get("file_descriptors", 0):>5} '
+                      f'{handles["contexts"]:>9} {handles["pages"]:>6}')
+    finally:
+        server.shutdown()
+
+    final = lifecycle.snapshot()
+    failures = []
+    if errors:
+        failures.append(f'{sum(errors.values())} scrapes were wrong: ' + '; '.join(
+            f'{problem} (x{times})' for problem, times in sorted(errors.items(), key=lambda item: -item[1])[:3]
+        ))
+    if samples:
+        growth = quarter_median(samples, 'total', last=True) - quarter_median(samples, 'total')
+        fd_growth = quarter_median(samples, 'fds', last=True) - quarter_median(samples, 'fds')
+        print(f'\nRSS growth (last quarter vs first quarter): {growth:+.1f} MB, file descriptors: {fd_growth:+.0f}')
+        if growth > args.max_growth_mb:
+            failures.append(f'memory grew by {growth:.1f} MB')
+        if fd_growth > args.max_fd_growth:
+            failures.append(f'file descriptors grew by {fd_growth:.0f}')
+    if final['open']['contexts'] or final['open']['pages']:
+        failures.append(f'{final["open"]["contexts"]} contexts and {final["open"]["pages"]} pages still open')
+    if final['memory'] and final['memory']['chromium_processes'] > (baseline['memory'] or {}).get('chromium_processes', 0):
+        failures.append(f'{final["memory"]["chromium_processes"]} Chromium processes still running')
+    print(f'counters: {final["counters"]}')
+
+    if failures:
+        print('FAILED: ' + '; '.join(failures))
+        sys.exit(1)
+    print(f'OK: {args.iterations} scrapes parsed correctly and memory and handles stayed flat')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = '''
+import time
+started = time.perf_counter()
+import scraper_api
+print(time.perf_counter() - started)
+'''
+
+SERVE_SNIPPET = '''
+import sys
+import scraper_api
+scraper_api.app.run(host='127.0.0.1', port=int(sys.argv[1]))
+'''
+
+
+def measure_import(env):
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_SNIPPET], cwd=API_DIR, env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_health(env, port, timeout):
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-c', SERVE_SNIPPET, str(port)],
+        cwd=API_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f'/health did not respond within {timeout}s')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Python scraper API cold-start time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--prewarm', default='', help='Value for SCRAPER_PREWARM, e.g. "reddit" or "all"')
+    args = parser.parse_args()
+
+    env = dict(os.environ, SCRAPER_PREWARM=args.prewarm)
+
+    import_times = [measure_import(env) for _ in range(args.runs)]
+    health_times = [measure_first_health(env, args.port, args.timeout) for _ in range(args.runs)]
+
+    print(f'prewarm: {args.prewarm or "none"} ({args.runs} runs)')
+    print(f'import scraper_api:      median {statistics.median(import_times) * 1000:.1f} ms, '
+          f'max {max(import_times) * 1000:.1f} ms')
+    print(f'time to first /health:   median {statistics.median(health_times) * 1000:.1f} ms, '
+          f'max {max(health_times) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+config = {
+    'prewarm': [name.strip() for name in os.environ.get('SCRAPER_PREWARM', '').split(',') if name.strip()],
+    'scraping': {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        # Pause after navigation for client-rendered content to appear
+        'settle_seconds': float(os.environ.get('SCRAPER_SETTLE_SECONDS', 3))
+    },
+    'fast_path': {
+        'enabled': os.environ.get('SCRAPER_FAST_PATH', 'true').lower() == 'true',
+        'platforms': ['instagram', 'twitter']
+    },
+    'latency': {
+        'window': 200,
+        'min_samples': 20,
+        'multiplier': 3,
+        'hedge': os.environ.get('SCRAPER_HEDGE_REQUESTS', 'true').lower() == 'true',
+        'hedge_workers': 8,
+        'timeouts': {'request': 30, 'navigation': 30, 'selector': 5},
+        'min_timeouts': {'request': 3, 'navigation': 5, 'selector': 1}
+    },
+    'circuit_breaker': {
+        'window': 20,
+        'min_calls': 5,
+        'failure_rate': 0.5,
+        'open_seconds': int(os.environ.get('SCRAPER_CIRCUIT_OPEN_SECONDS', 120)),
+        'half_open_max_calls': 1,
+        'half_open_successes': 2
+    },
+    'selectors': {
+        'max_elements': 100,
+        'max_layouts': 1000,
+        'window': 200,
+        'dead_after': 50
+    },
+    'crawler': {
+        'max_posts': int(os.environ.get('SCRAPER_PROFILE_MAX_POSTS', 50)),
+        'max_scrolls': 300,
+        'max_idle_scrolls': 5,
+        'scroll_step': 1500,
+        'scroll_pause_ms': 800,
+        'cutoff_patience': 5,
+        'prune_after_viewports': 3,
+        'platforms': {
+            'instagram': {
+                'pattern': r'^(https?://[^/]+/(?:[^/?#]+/)?(?:p|reel)/[^/?#]+/?)',
+                'container': 'article a'
+            },
+            'twitter': {
+                'pattern': r'^(https?://[^/]+/[^/?#]+/status/\d+)',
+                'container': 'article',
+                # The timeline already virtualizes its own rows.
+                'prune': False
+            },
+            'linkedin': {
+                'pattern': r'^(https?://[^/]+/(?:posts/[^/?#]+|feed/update/[^/?#]+))',
+                'container': '[data-urn]'
+            }
+        }
+    },
+    'planner': {
+        'deadline': int(os.environ.get('SCRAPER_EVENT_DEADLINE', 120)),
+        'window_days': 90,
+        'max_posts': 20,
+        'budget': {
+            'browser': int(os.environ.get('SCRAPER_MAX_BROWSERS', 3)),
+            'connection': int(os.environ.get('SCRAPER_MAX_CONNECTIONS', 8))
+        },
+        'resources': {
+            'instagram': 'browser',
+            'twitter': 'browser',
+            'linkedin': 'browser',
+            'reddit': 'connection'
+        },
+        # Platforms whose scraper implements search_posts, so planning does
+        # not have to import a scraper just to find out.
+        'search_platforms': ['reddit'],
+        # (posts or links found, seconds taken) per task until real runs are observed
+        'priors': {
+            'browser': {'discover': (15, 30), 'post': (1, 8)},
+            'connection': {'discover': (25, 2), 'post': (1, 1)}
+        },
+        'smoothing': 0.3,
+        'poll_seconds': 0.5
+    },
+    'dedup': {
+        'threshold': 0.7,
+        # Texts remembered per index (posts and comments each), oldest recycled first
+        'capacity': int(os.environ.get('SCRAPER_DEDUP_CAPACITY', 50000))
+    },
+    'sink': {
+        'type': os.environ.get('SCRAPER_SINK', 'none').lower(),
+        'path': os.environ.get('SCRAPER_SINK_PATH', os.path.join(BASE_DIR, 'data', 'scrapes.db'))
+    },
+    'lifecycle': {
+        'max_pages': int(os.environ.get('SCRAPER_MAX_PAGES', 8)),
+        'max_browsers': int(os.environ.get('SCRAPER_WORKER_BROWSERS', 4)),
+        'page_wait': 60,
+        'memory_ceiling_mb': int(os.environ.get('SCRAPER_MEMORY_CEILING_MB', 2048)),
+        'admit_wait': 30
+    },
+    'browser_state': {
+        'dir': os.environ.get('SCRAPER_STATE_DIR', os.path.join(BASE_DIR, '.browser_state')),
+        'slots': int(os.environ.get('SCRAPER_STATE_SLOTS', 4)),
+        'max_age': int(os.environ.get('SCRAPER_STATE_MAX_AGE', 24 * 60 * 60)),
+        'warm_up': os.environ.get('SCRAPER_WARM_UP', 'false').lower() == 'true',
+        'warm_up_urls': {
+            'instagram': 'https://www.instagram.com/',
+            'twitter': 'https://twitter.com/explore',
+            'linkedin': 'https://www.linkedin.com/feed/'
+        },
+        'consent_selectors': [
+            'button:has-text("Allow all cookies")',
+            'button:has-text("Accept all")',
+            'button:has-text("Accept")'
+        ]
+    }
+}
@@ -1,10 +1,15 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import logging
-from scrapers.instagram_scraper import InstagramScraper
-from scrapers.twitter_scraper import TwitterScraper
-from scrapers.linkedin_scraper import LinkedInScraper
-from scrapers.reddit_scraper import RedditScraper
+import threading
+from config import config
+from utils.browser_state import browser_state
+from utils.circuit_breaker import breakers
+from utils.latency import latency
+from utils.lifecycle import lifecycle
+from utils.registry import LazyRegistry
+from utils.scroll_crawler import parse_datetime
+from utils.selector_registry import selector_registry
 
 app = Flask(__name__)
 CORS(app)
@@ -12,16 +17,89 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-scrapers = {
-    'instagram': InstagramScraper(),
-    'twitter': TwitterScraper(),
-    'linkedin': LinkedInScraper(),
-    'reddit': RedditScraper()
-}
+# Scrapers and analytics services (and with them Playwright, BeautifulSoup,
+# requests and NumPy) are only imported the first time they are needed.
+scrapers = LazyRegistry({
+    'instagram': ('scrapers.instagram_scraper', 'InstagramScraper'),
+    'twitter': ('scrapers.twitter_scraper', 'TwitterScraper'),
+    'linkedin': ('scrapers.linkedin_scraper', 'LinkedInScraper'),
+    'reddit': ('scrapers.reddit_scraper', 'RedditScraper')
+})
+
+services = LazyRegistry({
+    'analyzer': ('services.analytics', 'SentimentAnalyzer'),
+    'deduplicator': ('services.dedup', 'Deduplicator'),
+    'planner': ('services.planner', 'EventPlanner')
+})
+
+sinks = LazyRegistry({
+    'sqlite': ('services.storage', 'SQLiteSink')
+})
+
+def positive(value, cast=int):
+    # Client-supplied limits are checked here, before any browser starts, so
+    # a malformed request is a 400 and never counts against a circuit.
+    if value is None:
+        return None
+    try:
+        value = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(value)
+    if not 0 < value < float('inf'):
+        raise ValueError(value)
+    return value
+
+def iso_date(value):
+    if value is None or value == '':
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+def engagement_summary(platform, result):
+    # Imported here so NumPy is only loaded once there are results to aggregate.
+    from services.engagement import EngagementAggregator
+    
+    return EngagementAggregator.from_posts(platform, result.get('posts', []), result.get('followers')).summary()
+
+def store(platform, posts, event_name):
+    # Persisting is best-effort: a full disk should not fail the scrape itself.
+    if config['sink']['type'] not in sinks:
+        return
+    try:
+        sinks[config['sink']['type']].write(platform, posts, event_name)
+    except Exception as e:
+        logger.error(f'Result sink error: {str(e)}')
+
+def prewarm(platforms):
+    scrapers.prewarm(platforms)
+    services.prewarm(list(services))
+    sinks.prewarm([config['sink']['type']])
+
+if config['prewarm']:
+    platforms = list(scrapers) if 'all' in config['prewarm'] else config['prewarm']
+    threading.Thread(target=prewarm, args=(platforms,), daemon=True).start()
+
+if config['browser_state']['warm_up']:
+    threading.Thread(target=browser_state.warm_up, args=(list(scrapers),), daemon=True).start()
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'OK', 'service': 'Python Scraper API'})
+    circuits = breakers.snapshot()
+    degraded = any(circuit['state'] != 'closed' for circuit in circuits.values())
+    return jsonify({
+        'status': 'DEGRADED' if degraded else 'OK',
+        'service': 'Python Scraper API',
+        'loaded': {**scrapers.loaded(), **services.loaded(), **sinks.loaded()},
+        'latency': latency.snapshot(),
+        'circuits': circuits,
+        'resources': lifecycle.snapshot()
+    })
+
+@app.route('/selectors', methods=['GET'])
+def selectors():
+    return jsonify(selector_registry.report())
 
 @app.route('/scrape', methods=['POST'])
 def scrape():
@@ -30,6 +108,10 @@ def scrape():
         url = data.get('url')
         platform = data.get('platform', '').lower()
         event_name = data.get('event_name', '')
+        collapse = data.get('collapse_duplicates', False)
+        # Fast-path platforms can then answer from the HTTP/JSON path even
+        # when it carries no comments.
+        options = {'counts_only': True} if data.get('counts_only') and platform in config['fast_path']['platforms'] else {}
         
         if not url:
             return jsonify({'error': 'URL is required'}), 400
@@ -39,10 +121,16 @@ def scrape():
         
         logger.info(f'Scraping {platform} URL: {url}')
         
-        scraper = scrapers[platform]
-        result = scraper.scrape_post(url)
+        result = breakers.guard(platform, lambda: scrapers[platform].scrape_post(url, **options))
+        if result.get('circuit_open') or result.get('busy'):
+            return jsonify(result), 503
         result['event_name'] = event_name
         
+        if 'error' not in result:
+            services['deduplicator'].process_post(result, collapse)
+            result['analytics'] = services['analyzer'].analyze([result])['posts'][0]
+            store(platform, [result], event_name)
+        
         return jsonify(result)
     
     except Exception as e:
@@ -56,19 +144,37 @@ def scrape_profile():
         url = data.get('url')
         platform = data.get('platform', '').lower()
         event_name = data.get('event_name', '')
+        collapse = data.get('collapse_duplicates', False)
+        skip_url = services['deduplicator'].is_mirror if data.get('skip_duplicates', False) else None
         
         if not url:
             return jsonify({'error': 'URL is required'}), 400
         
+        try:
+            max_posts = positive(data.get('max_posts'))
+            since = iso_date(data.get('since'))
+        except ValueError:
+            return jsonify({'error': 'max_posts must be a positive integer and since an ISO date'}), 400
+        
         if platform not in scrapers:
             return jsonify({'error': f'Unsupported platform: {platform}'}), 400
         
         logger.info(f'Scraping {platform} profile: {url}')
         
-        scraper = scrapers[platform]
-        result = scraper.scrape_profile(url)
+        result = breakers.guard(
+            platform,
+            lambda: scrapers[platform].scrape_profile(url, skip_url=skip_url, max_posts=max_posts, since=since)
+        )
+        if result.get('circuit_open') or result.get('busy'):
+            return jsonify(result), 503
         result['event_name'] = event_name
         
+        if 'error' not in result:
+            result['posts'] = services['deduplicator'].process_posts(result.get('posts', []), collapse)
+            result['analytics'] = services['analyzer'].analyze(result.get('posts', []))
+            result['engagement'] = engagement_summary(platform, result)
+            store(platform, result['posts'], event_name)
+        
         return jsonify(result)
     
     except Exception as e:
@@ -82,11 +188,16 @@ def search_posts():
         hashtag = data.get('hashtag', '')
         platform = data.get('platform', '').lower()
         event_name = data.get('event_name', '')
-        limit = data.get('limit', 10)
+        collapse = data.get('collapse_duplicates', False)
         
         if not hashtag:
             return jsonify({'error': 'Hashtag is required'}), 400
         
+        try:
+            limit = positive(data.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        
         if platform not in scrapers:
             return jsonify({'error': f'Unsupported platform: {platform}'}), 400
         
@@ -94,8 +205,15 @@ def search_posts():
         
         scraper = scrapers[platform]
         if hasattr(scraper, 'search_posts'):
-            result = scraper.search_posts(hashtag, limit)
+            result = breakers.guard(platform, scraper.search_posts, hashtag, limit)
+            if result.get('circuit_open') or result.get('busy'):
+                return jsonify(result), 503
             result['event_name'] = event_name
+            if 'error' not in result:
+                result['posts'] = services['deduplicator'].process_posts(result.get('posts', []), collapse)
+                result['analytics'] = services['analyzer'].analyze(result.get('posts', []))
+                result['engagement'] = engagement_summary(platform, result)
+                store(platform, result['posts'], event_name)
             return jsonify(result)
         else:
             return jsonify({'error': f'{platform} search not implemented'}), 501
@@ -104,5 +222,106 @@ def search_posts():
         logger.error(f'Search error: {str(e)}')
         return jsonify({'error': str(e)}), 500
 
+@app.route('/scrape-event', methods=['POST'])
+def scrape_event():
+    try:
+        data = request.json
+        event_name = data.get('event_name', '')
+        social_links = data.get('social_links') or {}
+        platforms = data.get('platforms') or []
+        collapse = data.get('collapse_duplicates', False)
+        skip_url = services['deduplicator'].is_mirror if data.get('skip_duplicates', False) else None
+        
+        if not event_name:
+            return jsonify({'error': 'Event name is required'}), 400
+        
+        if not isinstance(platforms, list) or not isinstance(social_links, dict):
+            return jsonify({'error': 'platforms must be a list and social_links an object'}), 400
+        
+        try:
+            deadline = positive(data.get('deadline'), float)
+            max_posts = positive(data.get('max_posts'))
+            iso_date(data.get('event_date'))
+        except ValueError:
+            return jsonify({'error': 'deadline and max_posts must be positive numbers and event_date an ISO date'}), 400
+        
+        logger.info(f'Scraping event: {event_name}')
+        
+        from services.engagement import EngagementAggregator
+        
+        aggregator = EngagementAggregator()
+        result = services['planner'].run(
+            scrapers,
+            event_name,
+            event_date=data.get('event_date'),
+            platforms=platforms,
+            social_links=social_links,
+            deadline=deadline,
+            max_posts=max_posts,
+            skip_url=skip_url,
+            aggregator=aggregator
+        )
+        
+        kept = services['deduplicator'].process_posts(result['posts'], collapse)
+        aggregator.discard({post.get('url') for post in result['posts']} - {post.get('url') for post in kept})
+        result['posts'] = kept
+        result['analytics'] = services['analyzer'].analyze(result['posts'])
+        result['engagement'] = aggregator.summary()
+        for platform in {post['platform'] for post in result['posts']}:
+            store(platform, [post for post in result['posts'] if post['platform'] == platform], event_name)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.error(f'Event scraping error: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    try:
+        data = request.json
+        posts = data.get('posts')
+        
+        if not isinstance(posts, list):
+            return jsonify({'error': 'posts must be a list'}), 400
+        
+        result = services['analyzer'].analyze(posts)
+        result['event_name'] = data.get('event_name', '')
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.error(f'Analytics error: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/posts', methods=['GET'])
+def posts():
+    try:
+        if config['sink']['type'] not in sinks:
+            return jsonify({'error': 'No result sink configured (set SCRAPER_SINK=sqlite)'}), 501
+        
+        sink = sinks[config['sink']['type']]
+        args = request.args
+        result = sink.query(
+            event_name=args.get('event_name'),
+            platform=args.get('platform', '').lower() or None,
+            since=args.get('since'),
+            until=args.get('until'),
+            # SQLite treats a negative LIMIT as no limit at all.
+            limit=min(max(args.get('limit', 100, type=int), 0), 1000),
+            offset=max(args.get('offset', 0, type=int), 0),
+            include_comments=args.get('include_comments', 'false').lower() == 'true'
+        )
+        
+        if args.get('include_history', 'false').lower() == 'true':
+            for post in result:
+                post['engagement_history'] = sink.engagement_history(post['platform'], post['post_id'])
+        
+        return jsonify({'posts': result, 'count': len(result)})
+    
+    except Exception as e:
+        logger.error(f'Posts query error: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
+from utils.latency import latency
 
 class GenericScraper:
     def __init__(self):
@@ -11,7 +11,7 @@ class GenericScraper:
     
     def scrape_post(self, url):
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = latency.get('generic', url, headers=self.headers)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -36,7 +36,7 @@ class GenericScraper:
         except Exception as e:
             return {'error': f'Generic scraping failed: {str(e)}'}
     
-    def scrape_profile(self, url):
+    def scrape_profile(self, url, skip_url=None, max_posts=None, since=None, scrape_posts=True):
         return {'error': 'Profile scraping not supported for generic URLs'}
     
     def _extract_title(self, soup):
@@ -75,7 +75,7 @@ class GenericScraper:
                         'user': 'Anonymous',
                         'text': text,
                         'likes': 0,
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': None
                     })
         
         return comments[:50]
@@ -118,4 +118,4 @@ class GenericScraper:
                 except:
                     pass
         
-        return datetime.now().isoformat()
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -1,27 +1,41 @@
 from playwright.sync_api import sync_playwright
+from bs4 import BeautifulSoup
+import json
 import re
 import time
-from datetime import datetime
+from config import config
+from utils.browser_state import browser_state
+from utils.circuit_breaker import breakers
+from utils.latency import latency
+from utils.lifecycle import lifecycle
+from utils.scroll_crawler import scroll_crawler
+from utils.selector_registry import selector_registry
 
 class InstagramScraper:
     def __init__(self):
         self.user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     
-    def scrape_post(self, url):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.user_agent)
-            page = context.new_page()
+    def scrape_post(self, url, counts_only=False):
+        if config['fast_path']['enabled']:
+            result = self._scrape_post_fast(url, counts_only)
+            # Without comments there is nothing to score sentiment on, so the
+            # browser still runs unless only the counts were asked for.
+            if result and (result['comments'] or counts_only):
+                return result
+        
+        with sync_playwright() as p, browser_state.open_context(p, 'instagram', self.user_agent) as context:
+            page = lifecycle.new_page(context)
             
             try:
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                time.sleep(3)
+                latency.goto(page, 'instagram', url, wait_until='networkidle')
+                time.sleep(config['scraping']['settle_seconds'])
+                layout = selector_registry.fingerprint(page)
                 
-                post_text = self._extract_post_text(page)
+                post_text = self._extract_post_text(page, layout)
                 comments = self._extract_comments(page)
-                likes = self._extract_likes(page)
-                timestamp = self._extract_timestamp(page)
-                author = self._extract_author(page)
+                likes = self._extract_likes(page, layout)
+                timestamp = self._extract_timestamp(page, layout)
+                author = self._extract_author(page, layout)
                 
                 return {
                     'url': url,
@@ -38,61 +52,158 @@ class InstagramScraper:
                 return {'error': f'Instagram scraping failed: {str(e)}'}
             
             finally:
-                browser.close()
+                lifecycle.close_page(page)
     
-    def scrape_profile(self, url):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.user_agent)
-            page = context.new_page()
+    def scrape_profile(self, url, skip_url=None, max_posts=None, since=None, scrape_posts=True):
+        # Posts are scraped once the profile's browser is closed; scrape_post
+        # starts its own sync_playwright(), which cannot be nested.
+        profile = self._scrape_profile_page(url, skip_url, max_posts, since)
+        if 'error' in profile:
+            return profile
+        
+        post_urls = profile['post_urls']
+        posts = []
+        for post_url in post_urls if scrape_posts else []:
+            if breakers.is_open('instagram'):
+                break
+            post_data = self.scrape_post(post_url)
+            breakers.record('instagram', post_data)
+            if 'error' not in post_data:
+                posts.append(post_data)
+        
+        profile['posts'] = posts
+        return profile
+    
+    def _scrape_profile_page(self, url, skip_url=None, max_posts=None, since=None):
+        with sync_playwright() as p, browser_state.open_context(p, 'instagram', self.user_agent) as context:
+            page = lifecycle.new_page(context)
             
             try:
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                time.sleep(3)
-                
-                username = self._extract_username(page)
-                followers = self._extract_followers(page)
-                following = self._extract_following(page)
-                posts_count = self._extract_posts_count(page)
-                post_urls = self._extract_post_urls(page)
+                latency.goto(page, 'instagram', url, wait_until='networkidle')
+                time.sleep(config['scraping']['settle_seconds'])
+                layout = selector_registry.fingerprint(page)
                 
-                posts = []
-                for post_url in post_urls[:10]:
-                    post_data = self.scrape_post(post_url)
-                    if 'error' not in post_data:
-                        posts.append(post_data)
+                username = self._extract_username(page, layout)
+                followers = self._extract_followers(page, layout)
+                following = self._extract_following(page, layout)
+                posts_count = self._extract_posts_count(page, layout)
+                post_urls = scroll_crawler.crawl(page, 'instagram', max_posts, since, skip_url)
                 
                 return {
                     'username': username,
                     'followers': followers,
                     'following': following,
                     'posts_count': posts_count,
-                    'posts': posts
+                    'post_urls': post_urls
                 }
             
             except Exception as e:
                 return {'error': f'Instagram profile scraping failed: {str(e)}'}
             
             finally:
-                browser.close()
+                lifecycle.close_page(page)
     
-    def _extract_post_text(self, page):
+    def _scrape_post_fast(self, url, counts_only=False):
         try:
-            selectors = ['h1', 'article span', '[class*="Caption"]']
-            for selector in selectors:
-                elements = page.query_selector_all(selector)
-                for el in elements:
-                    text = el.inner_text().strip()
-                    if text and len(text) > 10:
-                        return text
-            return ''
+            response = latency.get('instagram', url, hedge=False, headers={'User-Agent': self.user_agent})
+            if response.status_code != 200 or '/accounts/login' in response.url:
+                return None
+            
+            soup = BeautifulSoup(response.content, 'html.parser')
+            # og:description never carries comments, so it only helps counts.
+            post = self._parse_ld_json(soup) or (self._parse_og_meta(soup) if counts_only else None)
+            if not post or not (post['post_text'] or post['likes']):
+                return None
+            
+            return {
+                'url': url,
+                'post_text': post['post_text'],
+                'author': post['author'] or 'unknown',
+                'comments': post['comments'],
+                'likes': post['likes'],
+                'shares': 0,
+                'timestamp': post['timestamp'],
+                'post_type': self._detect_post_type(url)
+            }
+        except Exception:
+            return None
+    
+    def _parse_ld_json(self, soup):
+        for script in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+            try:
+                data = json.loads(script.string or '')
+            except ValueError:
+                continue
+            
+            for item in data if isinstance(data, list) else [data]:
+                if not isinstance(item, dict) or item.get('@type') not in ('SocialMediaPosting', 'ImageObject', 'VideoObject'):
+                    continue
+                
+                likes = 0
+                for stat in self._ld_list(item.get('interactionStatistic')):
+                    if 'Like' in str(stat.get('interactionType', '')):
+                        likes = self._parse_number(str(stat.get('userInteractionCount') or 0).replace(',', ''))
+                
+                comments = []
+                for comment in self._ld_list(item.get('comment')):
+                    comments.append({
+                        'user': self._ld_author(comment.get('author')) or 'unknown',
+                        'text': comment.get('text', ''),
+                        'likes': 0,
+                        'timestamp': comment.get('dateCreated')
+                    })
+                
+                return {
+                    'post_text': (item.get('articleBody') or item.get('caption') or item.get('description') or '').strip(),
+                    'author': self._ld_author(item.get('author')),
+                    'likes': likes,
+                    'comments': comments,
+                    'timestamp': item.get('dateCreated') or item.get('uploadDate')
+                }
+        return None
+    
+    def _ld_list(self, value):
+        # ld+json allows a single object wherever a list is expected.
+        if isinstance(value, dict):
+            return [value]
+        return [entry for entry in value if isinstance(entry, dict)] if isinstance(value, list) else []
+    
+    def _ld_author(self, author):
+        if isinstance(author, list):
+            author = author[0] if author else None
+        if isinstance(author, dict):
+            return (author.get('alternateName') or author.get('name') or '').lstrip('@')
+        return None
+    
+    def _parse_og_meta(self, soup):
+        # e.g. '1,234 likes, 56 comments - someuser on March 3, 2024: "Caption"'
+        meta = soup.find('meta', attrs={'property': 'og:description'}) or soup.find('meta', attrs={'name': 'description'})
+        description = meta.get('content', '').strip() if meta else ''
+        match = re.match(r'^([\d.,]+[KMB]?) likes?, [\d.,]+[KMB]? comments? - (\S+) on [^:]+: [\"\u201c]?(.*?)[\"\u201d]?\.?$', description, re.S | re.I)
+        if not match:
+            return None
+        
+        return {
+            'post_text': match.group(3).strip(),
+            'author': match.group(2),
+            'likes': self._parse_number(match.group(1).replace(',', '')),
+            'comments': [],
+            'timestamp': None
+        }
+    
+    def _extract_post_text(self, page, layout=None):
+        try:
+            text = selector_registry.resolve(
+                page, 'instagram', 'post_text', lambda text: text if len(text) > 10 else None, layout
+            )
+            return text or ''
         except:
             return ''
     
     def _extract_comments(self, page):
         comments = []
         try:
-            page.wait_for_selector('ul li', timeout=5000)
+            latency.wait_for_selector(page, 'instagram', 'ul li')
             comment_elements = page.query_selector_all('ul li')
             
             for el in comment_elements[:50]:
@@ -111,7 +222,7 @@ class InstagramScraper:
                             'user': user,
                             'text': comment_text,
                             'likes': 0,
-                            'timestamp': datetime.now().isoformat()
+                            'timestamp': None
                         })
                 except:
                     continue
@@ -120,96 +231,67 @@ class InstagramScraper:
         
         return comments
     
-    def _extract_likes(self, page):
+    def _extract_likes(self, page, layout=None):
         try:
-            selectors = ['section button span', '[class*="like"]', 'section a']
-            for selector in selectors:
-                elements = page.query_selector_all(selector)
-                for el in elements:
-                    text = el.inner_text().strip()
-                    match = re.search(r'([\d,]+)\s*like', text, re.IGNORECASE)
-                    if match:
-                        return int(match.group(1).replace(',', ''))
-            return 0
+            likes = selector_registry.resolve(page, 'instagram', 'likes', self._parse_likes, layout)
+            return likes or 0
         except:
             return 0
     
-    def _extract_timestamp(self, page):
+    def _extract_timestamp(self, page, layout=None):
         try:
-            time_el = page.query_selector('time')
-            if time_el:
-                datetime_attr = time_el.get_attribute('datetime')
-                if datetime_attr:
-                    return datetime_attr
-            return datetime.now().isoformat()
+            timestamp = selector_registry.resolve(page, 'instagram', 'timestamp', layout=layout)
+            return timestamp or None
         except:
-            return datetime.now().isoformat()
+            return None
     
-    def _extract_author(self, page):
+    def _extract_author(self, page, layout=None):
         try:
-            selectors = ['header a', '[class*="Username"]']
-            for selector in selectors:
-                el = page.query_selector(selector)
-                if el:
-                    return el.inner_text().strip()
-            return 'unknown'
+            author = selector_registry.resolve(page, 'instagram', 'author', layout=layout)
+            return author or 'unknown'
         except:
             return 'unknown'
     
-    def _extract_username(self, page):
+    def _extract_username(self, page, layout=None):
         try:
-            el = page.query_selector('header h2, header h1')
-            if el:
-                return el.inner_text().strip()
-            return 'unknown'
+            username = selector_registry.resolve(page, 'instagram', 'username', layout=layout)
+            return username or 'unknown'
         except:
             return 'unknown'
     
-    def _extract_followers(self, page):
+    def _extract_followers(self, page, layout=None):
         try:
-            el = page.query_selector('a[href*="followers"] span')
-            if el:
-                text = el.inner_text().strip()
-                return self._parse_number(text)
-            return 0
+            followers = selector_registry.resolve(page, 'instagram', 'followers', self._parse_number, layout)
+            return followers or 0
         except:
             return 0
     
-    def _extract_following(self, page):
+    def _extract_following(self, page, layout=None):
         try:
-            el = page.query_selector('a[href*="following"] span')
-            if el:
-                text = el.inner_text().strip()
-                return self._parse_number(text)
-            return 0
+            following = selector_registry.resolve(page, 'instagram', 'following', self._parse_number, layout)
+            return following or 0
         except:
             return 0
     
-    def _extract_posts_count(self, page):
+    def _extract_posts_count(self, page, layout=None):
         try:
-            elements = page.query_selector_all('header span, header li')
-            for el in elements:
-                text = el.inner_text().strip()
-                if 'post' in text.lower():
-                    match = re.search(r'([\d,]+)', text)
-                    if match:
-                        return int(match.group(1).replace(',', ''))
-            return 0
+            posts_count = selector_registry.resolve(page, 'instagram', 'posts_count', self._parse_posts_count, layout)
+            return posts_count or 0
         except:
             return 0
     
-    def _extract_post_urls(self, page):
-        urls = []
-        try:
-            links = page.query_selector_all('article a')
-            for link in links[:20]:
-                href = link.get_attribute('href')
-                if href and '/p/' in href:
-                    full_url = f'https://www.instagram.com{href}' if not href.startswith('http') else href
-                    urls.append(full_url)
-            return list(set(urls))
-        except:
-            return []
+    def _parse_likes(self, text):
+        match = re.search(r'([\d,]+)\s*like', text, re.IGNORECASE)
+        if match:
+            return int(match.group(1).replace(',', ''))
+        return None
+    
+    def _parse_posts_count(self, text):
+        if 'post' in text.lower():
+            match = re.search(r'([\d,]+)', text)
+            if match:
+                return int(match.group(1).replace(',', ''))
+        return None
     
     def _detect_post_type(self, url):
         if '/reel/' in url:
@@ -1,27 +1,32 @@
 from playwright.sync_api import sync_playwright
 import re
 import time
-from datetime import datetime
+from config import config
+from utils.browser_state import browser_state
+from utils.circuit_breaker import breakers
+from utils.latency import latency
+from utils.lifecycle import lifecycle
+from utils.scroll_crawler import scroll_crawler
+from utils.selector_registry import selector_registry
 
 class LinkedInScraper:
     def __init__(self):
         self.user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     
     def scrape_post(self, url):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.user_agent)
-            page = context.new_page()
+        with sync_playwright() as p, browser_state.open_context(p, 'linkedin', self.user_agent) as context:
+            page = lifecycle.new_page(context)
             
             try:
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                time.sleep(3)
+                latency.goto(page, 'linkedin', url, wait_until='networkidle')
+                time.sleep(config['scraping']['settle_seconds'])
+                layout = selector_registry.fingerprint(page)
                 
-                post_text = self._extract_post_text(page)
+                post_text = self._extract_post_text(page, layout)
                 comments = self._extract_comments(page)
-                reactions = self._extract_reactions(page)
-                timestamp = self._extract_timestamp(page)
-                author = self._extract_author(page)
+                reactions = self._extract_reactions(page, layout)
+                timestamp = self._extract_timestamp(page, layout)
+                author = self._extract_author(page, layout)
                 
                 return {
                     'url': url,
@@ -38,50 +43,59 @@ class LinkedInScraper:
                 return {'error': f'LinkedIn scraping failed: {str(e)}'}
             
             finally:
-                browser.close()
+                lifecycle.close_page(page)
     
-    def scrape_profile(self, url):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.user_agent)
-            page = context.new_page()
+    def scrape_profile(self, url, skip_url=None, max_posts=None, since=None, scrape_posts=True):
+        # Posts are scraped once the profile's browser is closed; scrape_post
+        # starts its own sync_playwright(), which cannot be nested.
+        profile = self._scrape_profile_page(url, skip_url, max_posts, since)
+        if 'error' in profile:
+            return profile
+        
+        post_urls = profile['post_urls']
+        posts = []
+        for post_url in post_urls if scrape_posts else []:
+            if breakers.is_open('linkedin'):
+                break
+            post_data = self.scrape_post(post_url)
+            breakers.record('linkedin', post_data)
+            if 'error' not in post_data:
+                posts.append(post_data)
+        
+        profile['posts'] = posts
+        return profile
+    
+    def _scrape_profile_page(self, url, skip_url=None, max_posts=None, since=None):
+        with sync_playwright() as p, browser_state.open_context(p, 'linkedin', self.user_agent) as context:
+            page = lifecycle.new_page(context)
             
             try:
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                time.sleep(3)
+                latency.goto(page, 'linkedin', url, wait_until='networkidle')
+                time.sleep(config['scraping']['settle_seconds'])
+                layout = selector_registry.fingerprint(page)
                 
-                username = self._extract_username(page)
-                connections = self._extract_connections(page)
-                post_urls = self._extract_post_urls(page)
-                
-                posts = []
-                for post_url in post_urls[:10]:
-                    post_data = self.scrape_post(post_url)
-                    if 'error' not in post_data:
-                        posts.append(post_data)
+                username = self._extract_username(page, layout)
+                connections = self._extract_connections(page, layout)
+                post_urls = scroll_crawler.crawl(page, 'linkedin', max_posts, since, skip_url)
                 
                 return {
                     'username': username,
                     'followers': connections,
                     'following': 0,
                     'posts_count': len(post_urls),
-                    'posts': posts
+                    'post_urls': post_urls
                 }
             
             except Exception as e:
                 return {'error': f'LinkedIn profile scraping failed: {str(e)}'}
             
             finally:
-                browser.close()
+                lifecycle.close_page(page)
     
-    def _extract_post_text(self, page):
+    def _extract_post_text(self, page, layout=None):
         try:
-            selectors = ['.feed-shared-text', '[class*="feed-shared-update-v2__description"]']
-            for selector in selectors:
-                el = page.query_selector(selector)
-                if el:
-                    return el.inner_text().strip()
-            return ''
+            text = selector_registry.resolve(page, 'linkedin', 'post_text', layout=layout)
+            return text or ''
         except:
             return ''
     
@@ -100,7 +114,7 @@ class LinkedInScraper:
                             'user': author_el.inner_text().strip(),
                             'text': text_el.inner_text().strip(),
                             'likes': 0,
-                            'timestamp': datetime.now().isoformat()
+                            'timestamp': None
                         })
                 except:
                     continue
@@ -109,71 +123,46 @@ class LinkedInScraper:
         
         return comments
     
-    def _extract_reactions(self, page):
+    def _extract_reactions(self, page, layout=None):
         try:
-            selectors = ['.social-details-social-counts__reactions-count', '[aria-label*="reaction"]']
-            for selector in selectors:
-                el = page.query_selector(selector)
-                if el:
-                    text = el.inner_text().strip()
-                    match = re.search(r'([\d,]+)', text)
-                    if match:
-                        return int(match.group(1).replace(',', ''))
-            return 0
+            reactions = selector_registry.resolve(page, 'linkedin', 'reactions', self._parse_count, layout)
+            return reactions or 0
         except:
             return 0
     
-    def _extract_timestamp(self, page):
+    def _extract_timestamp(self, page, layout=None):
         try:
-            time_el = page.query_selector('time')
-            if time_el:
-                datetime_attr = time_el.get_attribute('datetime')
-                if datetime_attr:
-                    return datetime_attr
-            return datetime.now().isoformat()
+            timestamp = selector_registry.resolve(page, 'linkedin', 'timestamp', layout=layout)
+            return timestamp or None
         except:
-            return datetime.now().isoformat()
+            return None
     
-    def _extract_author(self, page):
+    def _extract_author(self, page, layout=None):
         try:
-            el = page.query_selector('.feed-shared-actor__name')
-            if el:
-                return el.inner_text().strip()
-            return 'unknown'
+            author = selector_registry.resolve(page, 'linkedin', 'author', layout=layout)
+            return author or 'unknown'
         except:
             return 'unknown'
     
-    def _extract_username(self, page):
+    def _extract_username(self, page, layout=None):
         try:
-            el = page.query_selector('h1')
-            if el:
-                return el.inner_text().strip()
-            return 'unknown'
+            username = selector_registry.resolve(page, 'linkedin', 'username', layout=layout)
+            return username or 'unknown'
         except:
             return 'unknown'
     
-    def _extract_connections(self, page):
+    def _extract_connections(self, page, layout=None):
         try:
-            el = page.query_selector('.pv-top-card--list-bullet li')
-            if el:
-                text = el.inner_text().strip()
-                return self._parse_number(text)
-            return 0
+            connections = selector_registry.resolve(page, 'linkedin', 'connections', self._parse_number, layout)
+            return connections or 0
         except:
             return 0
     
-    def _extract_post_urls(self, page):
-        urls = []
-        try:
-            links = page.query_selector_all('a[href*="/posts/"]')
-            for link in links[:20]:
-                href = link.get_attribute('href')
-                if href:
-                    full_url = f'https://www.linkedin.com{href}' if not href.startswith('http') else href
-                    urls.append(full_url)
-            return list(set(urls))
-        except:
-            return []
+    def _parse_count(self, text):
+        match = re.search(r'([\d,]+)', text)
+        if match:
+            return int(match.group(1).replace(',', ''))
+        return None
     
     def _parse_number(self, text):
         multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
@@ -1,5 +1,8 @@
-import requests
-from datetime import datetime
+from datetime import datetime, timezone
+from config import config
+from utils.circuit_breaker import breakers
+from utils.latency import latency
+from utils.scroll_crawler import parse_datetime
 
 class RedditScraper:
     def __init__(self):
@@ -11,7 +14,7 @@ class RedditScraper:
         try:
             json_url = url + '.json' if not url.endswith('.json') else url
             
-            response = requests.get(json_url, headers=self.headers, timeout=30)
+            response = latency.get('reddit', json_url, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
@@ -31,7 +34,7 @@ class RedditScraper:
                     'downvotes': post.get('downs', 0),
                     'upvote_ratio': post.get('upvote_ratio', 0),
                     'shares': 0,
-                    'timestamp': datetime.fromtimestamp(post.get('created_utc', 0)).isoformat(),
+                    'timestamp': self._timestamp(post.get('created_utc')),
                     'awards': post.get('total_awards_received', 0),
                     'post_type': post.get('post_hint', 'text')
                 }
@@ -41,37 +44,104 @@ class RedditScraper:
         except Exception as e:
             return {'error': f'Reddit scraping failed: {str(e)}'}
     
-    def scrape_profile(self, url):
+    def scrape_profile(self, url, skip_url=None, max_posts=None, since=None, scrape_posts=True):
         try:
             json_url = url + '.json' if not url.endswith('.json') else url
-            
-            response = requests.get(json_url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            max_posts = max_posts or config['crawler']['max_posts']
+            since = parse_datetime(since)
             
             username = url.split('/')[-1] if url.split('/')[-1] else 'unknown'
             posts = []
+            post_urls = []
+            after = None
             
-            if 'data' in data and 'children' in data['data']:
-                for item in data['data']['children'][:10]:
+            # Listings are paged with the `after` cursor instead of scrolling.
+            while len(post_urls) < max_posts and not breakers.is_open('reddit'):
+                params = {'limit': 100, 'after': after} if after else {'limit': 100}
+                response = latency.get('reddit', json_url, headers=self.headers, params=params)
+                response.raise_for_status()
+                
+                data = response.json().get('data', {})
+                children = data.get('children', [])
+                if not children:
+                    break
+                
+                for item in children:
                     post_data = item['data']
+                    posted = datetime.fromtimestamp(post_data.get('created_utc', 0), tz=timezone.utc)
+                    if since and posted < since and not post_data.get('stickied'):
+                        after = None
+                        break
                     post_url = f"https://www.reddit.com{post_data.get('permalink', '')}"
+                    if breakers.is_open('reddit') or len(post_urls) >= max_posts:
+                        break
+                    if skip_url and skip_url(post_url):
+                        continue
+                    post_urls.append(post_url)
+                    if not scrape_posts:
+                        continue
                     post = self.scrape_post(post_url)
+                    breakers.record('reddit', post)
                     if 'error' not in post:
                         posts.append(post)
+                else:
+                    after = data.get('after')
+                
+                if not after:
+                    break
             
             return {
                 'username': username,
                 'followers': 0,
                 'following': 0,
                 'posts_count': len(posts),
-                'posts': posts
+                'posts': posts,
+                'post_urls': post_urls
             }
         
         except Exception as e:
             return {'error': f'Reddit profile scraping failed: {str(e)}'}
     
+    def search_posts(self, query, limit=10, since=None, scrape_posts=True):
+        try:
+            since = parse_datetime(since)
+            params = {'q': query, 'sort': 'new', 'limit': min(max(int(limit), 1), 100)}
+            
+            response = latency.get('reddit', 'https://www.reddit.com/search.json', headers=self.headers, params=params)
+            response.raise_for_status()
+            
+            post_urls = []
+            for item in response.json().get('data', {}).get('children', []):
+                post_data = item['data']
+                posted = datetime.fromtimestamp(post_data.get('created_utc', 0), tz=timezone.utc)
+                if since and posted < since:
+                    continue
+                post_urls.append(f"https://www.reddit.com{post_data.get('permalink', '')}")
+            
+            posts = []
+            for post_url in post_urls if scrape_posts else []:
+                if breakers.is_open('reddit'):
+                    break
+                post = self.scrape_post(post_url)
+                breakers.record('reddit', post)
+                if 'error' not in post:
+                    posts.append(post)
+            
+            return {
+                'query': query,
+                'posts': posts,
+                'post_urls': post_urls
+            }
+        
+        except Exception as e:
+            return {'error': f'Reddit search failed: {str(e)}'}
+    
+    def _timestamp(self, created_utc):
+        # created_utc is UTC; a missing value stays unknown instead of 1970.
+        if not created_utc:
+            return None
+        return datetime.fromtimestamp(created_utc, tz=timezone.utc).isoformat()
+    
     def _parse_comments(self, comments_data):
         comments = []
         
@@ -83,7 +153,7 @@ class RedditScraper:
                         'user': comment.get('author', 'unknown'),
                         'text': comment.get('body', ''),
                         'likes': comment.get('ups', 0) - comment.get('downs', 0),
-                        'timestamp': datetime.fromtimestamp(comment.get('created_utc', 0)).isoformat(),
+                        'timestamp': self._timestamp(comment.get('created_utc')),
                         'replies_count': 0,
                         'awards': comment.get('total_awards_received', 0)
                     })
@@ -0,0 +1,34 @@
+# Fallback selectors per platform and field, in their initial order of
+# preference. The selector registry reorders them by observed hit rate.
+# 'attribute' reads an attribute instead of innerText; 'limit' caps how many
+# matching elements are read per selector (1 = first match only).
+SELECTORS = {
+    'instagram': {
+        'post_text': {'selectors': ['h1', 'article span', '[class*="Caption"]']},
+        'likes': {'selectors': ['section button span', '[class*="like"]', 'section a']},
+        'author': {'selectors': ['header a', '[class*="Username"]'], 'limit': 1},
+        'username': {'selectors': ['header h2', 'header h1'], 'limit': 1},
+        'followers': {'selectors': ['a[href*="followers"] span'], 'limit': 1},
+        'following': {'selectors': ['a[href*="following"] span'], 'limit': 1},
+        'posts_count': {'selectors': ['header span', 'header li']},
+        'timestamp': {'selectors': ['time'], 'attribute': 'datetime', 'limit': 1}
+    },
+    'twitter': {
+        'post_text': {'selectors': ['[data-testid="tweetText"]', 'article div[lang]'], 'limit': 1},
+        'likes': {'selectors': ['[data-testid="like"]', '[aria-label*="like"]'], 'attribute': 'aria-label', 'limit': 1},
+        'retweets': {'selectors': ['[data-testid="retweet"]', '[aria-label*="retweet"]'], 'attribute': 'aria-label', 'limit': 1},
+        'author': {'selectors': ['[data-testid="User-Name"]'], 'limit': 1},
+        'username': {'selectors': ['[data-testid="UserName"]'], 'limit': 1},
+        'followers': {'selectors': ['a[href*="/followers"] span'], 'limit': 1},
+        'following': {'selectors': ['a[href*="/following"] span'], 'limit': 1},
+        'timestamp': {'selectors': ['time'], 'attribute': 'datetime', 'limit': 1}
+    },
+    'linkedin': {
+        'post_text': {'selectors': ['.feed-shared-text', '[class*="feed-shared-update-v2__description"]'], 'limit': 1},
+        'reactions': {'selectors': ['.social-details-social-counts__reactions-count', '[aria-label*="reaction"]'], 'limit': 1},
+        'author': {'selectors': ['.feed-shared-actor__name'], 'limit': 1},
+        'username': {'selectors': ['h1'], 'limit': 1},
+        'connections': {'selectors': ['.pv-top-card--list-bullet li'], 'limit': 1},
+        'timestamp': {'selectors': ['time'], 'attribute': 'datetime', 'limit': 1}
+    }
+}
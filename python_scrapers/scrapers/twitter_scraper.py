@@ -1,28 +1,41 @@
 from playwright.sync_api import sync_playwright
 import re
+import struct
 import time
-from datetime import datetime
+from config import config
+from utils.browser_state import browser_state
+from utils.circuit_breaker import breakers
+from utils.latency import latency
+from utils.lifecycle import lifecycle
+from utils.scroll_crawler import scroll_crawler
+from utils.selector_registry import selector_registry
 
 class TwitterScraper:
     def __init__(self):
         self.user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     
-    def scrape_post(self, url):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.user_agent)
-            page = context.new_page()
+    def scrape_post(self, url, counts_only=False):
+        # The syndication endpoint has no replies, and without comments there
+        # is nothing to score sentiment on, so it is only asked for counts.
+        if counts_only and config['fast_path']['enabled']:
+            result = self._scrape_post_fast(url)
+            if result:
+                return result
+        
+        with sync_playwright() as p, browser_state.open_context(p, 'twitter', self.user_agent) as context:
+            page = lifecycle.new_page(context)
             
             try:
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                time.sleep(3)
+                latency.goto(page, 'twitter', url, wait_until='networkidle')
+                time.sleep(config['scraping']['settle_seconds'])
+                layout = selector_registry.fingerprint(page)
                 
-                post_text = self._extract_post_text(page)
+                post_text = self._extract_post_text(page, layout)
                 comments = self._extract_comments(page)
-                likes = self._extract_likes(page)
-                retweets = self._extract_retweets(page)
-                timestamp = self._extract_timestamp(page)
-                author = self._extract_author(page)
+                likes = self._extract_likes(page, layout)
+                retweets = self._extract_retweets(page, layout)
+                timestamp = self._extract_timestamp(page, layout)
+                author = self._extract_author(page, layout)
                 
                 return {
                     'url': url,
@@ -39,58 +52,141 @@ class TwitterScraper:
                 return {'error': f'Twitter scraping failed: {str(e)}'}
             
             finally:
-                browser.close()
+                lifecycle.close_page(page)
+    
+    def scrape_profile(self, url, skip_url=None, max_posts=None, since=None, scrape_posts=True):
+        # Posts are scraped once the profile's browser is closed; scrape_post
+        # starts its own sync_playwright(), which cannot be nested.
+        profile = self._scrape_profile_page(url, skip_url, max_posts, since)
+        if 'error' in profile:
+            return profile
+        
+        tweet_urls = profile['post_urls']
+        posts = []
+        for tweet_url in tweet_urls if scrape_posts else []:
+            if breakers.is_open('twitter'):
+                break
+            post_data = self.scrape_post(tweet_url)
+            breakers.record('twitter', post_data)
+            if 'error' not in post_data:
+                posts.append(post_data)
+        
+        profile['posts'] = posts
+        return profile
     
-    def scrape_profile(self, url):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.user_agent)
-            page = context.new_page()
+    def _scrape_profile_page(self, url, skip_url=None, max_posts=None, since=None):
+        with sync_playwright() as p, browser_state.open_context(p, 'twitter', self.user_agent) as context:
+            page = lifecycle.new_page(context)
             
             try:
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                time.sleep(3)
+                latency.goto(page, 'twitter', url, wait_until='networkidle')
+                time.sleep(config['scraping']['settle_seconds'])
+                layout = selector_registry.fingerprint(page)
                 
-                username = self._extract_username(page)
-                followers = self._extract_followers(page)
-                following = self._extract_following(page)
-                tweet_urls = self._extract_tweet_urls(page)
-                
-                posts = []
-                for tweet_url in tweet_urls[:10]:
-                    post_data = self.scrape_post(tweet_url)
-                    if 'error' not in post_data:
-                        posts.append(post_data)
+                username = self._extract_username(page, layout)
+                followers = self._extract_followers(page, layout)
+                following = self._extract_following(page, layout)
+                tweet_urls = scroll_crawler.crawl(page, 'twitter', max_posts, since, skip_url)
                 
                 return {
                     'username': username,
                     'followers': followers,
                     'following': following,
                     'posts_count': len(tweet_urls),
-                    'posts': posts
+                    'post_urls': tweet_urls
                 }
             
             except Exception as e:
                 return {'error': f'Twitter profile scraping failed: {str(e)}'}
             
             finally:
-                browser.close()
+                lifecycle.close_page(page)
     
-    def _extract_post_text(self, page):
+    def _scrape_post_fast(self, url):
+        match = re.search(r'/status(?:es)?/(\d+)', url)
+        if not match:
+            return None
+        
+        tweet_id = match.group(1)
         try:
-            selectors = ['[data-testid="tweetText"]', 'article div[lang]']
-            for selector in selectors:
-                el = page.query_selector(selector)
-                if el:
-                    return el.inner_text().strip()
-            return ''
+            response = latency.get(
+                'twitter',
+                'https://cdn.syndication.twimg.com/tweet-result',
+                params={'id': tweet_id, 'lang': 'en', 'token': self._syndication_token(tweet_id)},
+                headers={'User-Agent': self.user_agent}
+            )
+            if response.status_code != 200:
+                return None
+            
+            data = response.json()
+            if not data.get('text'):
+                return None
+            
+            user = data.get('user') or {}
+            return {
+                'url': url,
+                'post_text': data['text'].strip(),
+                'author': user.get('name') or user.get('screen_name') or 'unknown',
+                'comments': [],
+                'likes': int(data.get('favorite_count') or 0),
+                'shares': int(data.get('retweet_count') or 0),
+                'timestamp': data.get('created_at'),
+                'post_type': 'tweet'
+            }
+        except Exception:
+            return None
+    
+    def _syndication_token(self, tweet_id):
+        # Port of the embed widget's token: ((id / 1e15) * PI).toString(36)
+        # with zeros and the point removed, following V8's radix conversion.
+        value = (float(int(tweet_id)) / 1e15) * 3.141592653589793
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+        
+        integer = int(value)
+        fraction = value - integer
+        next_value = struct.unpack('<d', struct.pack('<q', struct.unpack('<q', struct.pack('<d', value))[0] + 1))[0]
+        delta = max(0.5 * (next_value - value), 5e-324)
+        
+        fraction_digits = []
+        if fraction >= delta:
+            while True:
+                fraction *= 36
+                delta *= 36
+                digit = int(fraction)
+                fraction_digits.append(digit)
+                fraction -= digit
+                if (fraction > 0.5 or (fraction == 0.5 and digit & 1)) and fraction + delta > 1:
+                    while fraction_digits and fraction_digits[-1] + 1 >= 36:
+                        fraction_digits.pop()
+                    if fraction_digits:
+                        fraction_digits[-1] += 1
+                    else:
+                        integer += 1
+                    break
+                if fraction < delta:
+                    break
+        
+        integer_digits = ''
+        while True:
+            integer, remainder = divmod(integer, 36)
+            integer_digits = digits[remainder] + integer_digits
+            if not integer:
+                break
+        
+        token = integer_digits + ''.join(digits[digit] for digit in fraction_digits)
+        return token.replace('0', '')
+    
+    def _extract_post_text(self, page, layout=None):
+        try:
+            text = selector_registry.resolve(page, 'twitter', 'post_text', layout=layout)
+            return text or ''
         except:
             return ''
     
     def _extract_comments(self, page):
         comments = []
         try:
-            page.wait_for_selector('[data-testid="reply"]', timeout=5000)
+            latency.wait_for_selector(page, 'twitter', '[data-testid="reply"]')
             comment_elements = page.query_selector_all('article')
             
             for el in comment_elements[:30]:
@@ -103,7 +199,7 @@ class TwitterScraper:
                             'user': author_el.inner_text().strip().split('\n')[0],
                             'text': text_el.inner_text().strip(),
                             'likes': 0,
-                            'timestamp': datetime.now().isoformat()
+                            'timestamp': None
                         })
                 except:
                     continue
@@ -112,97 +208,60 @@ class TwitterScraper:
         
         return comments
     
-    def _extract_likes(self, page):
+    def _extract_likes(self, page, layout=None):
         try:
-            selectors = ['[data-testid="like"]', '[aria-label*="like"]']
-            for selector in selectors:
-                el = page.query_selector(selector)
-                if el:
-                    aria_label = el.get_attribute('aria-label')
-                    if aria_label:
-                        match = re.search(r'([\d,]+)', aria_label)
-                        if match:
-                            return int(match.group(1).replace(',', ''))
-            return 0
+            likes = selector_registry.resolve(page, 'twitter', 'likes', self._parse_count, layout)
+            return likes or 0
         except:
             return 0
     
-    def _extract_retweets(self, page):
+    def _extract_retweets(self, page, layout=None):
         try:
-            selectors = ['[data-testid="retweet"]', '[aria-label*="retweet"]']
-            for selector in selectors:
-                el = page.query_selector(selector)
-                if el:
-                    aria_label = el.get_attribute('aria-label')
-                    if aria_label:
-                        match = re.search(r'([\d,]+)', aria_label)
-                        if match:
-                            return int(match.group(1).replace(',', ''))
-            return 0
+            retweets = selector_registry.resolve(page, 'twitter', 'retweets', self._parse_count, layout)
+            return retweets or 0
         except:
             return 0
     
-    def _extract_timestamp(self, page):
+    def _extract_timestamp(self, page, layout=None):
         try:
-            time_el = page.query_selector('time')
-            if time_el:
-                datetime_attr = time_el.get_attribute('datetime')
-                if datetime_attr:
-                    return datetime_attr
-            return datetime.now().isoformat()
+            timestamp = selector_registry.resolve(page, 'twitter', 'timestamp', layout=layout)
+            return timestamp or None
         except:
-            return datetime.now().isoformat()
+            return None
     
-    def _extract_author(self, page):
+    def _extract_author(self, page, layout=None):
         try:
-            el = page.query_selector('[data-testid="User-Name"]')
-            if el:
-                return el.inner_text().strip().split('\n')[0]
-            return 'unknown'
+            author = selector_registry.resolve(page, 'twitter', 'author', lambda text: text.split('\n')[0], layout)
+            return author or 'unknown'
         except:
             return 'unknown'
     
-    def _extract_username(self, page):
+    def _extract_username(self, page, layout=None):
         try:
-            el = page.query_selector('[data-testid="UserName"]')
-            if el:
-                return el.inner_text().strip()
-            return 'unknown'
+            username = selector_registry.resolve(page, 'twitter', 'username', layout=layout)
+            return username or 'unknown'
         except:
             return 'unknown'
     
-    def _extract_followers(self, page):
+    def _extract_followers(self, page, layout=None):
         try:
-            el = page.query_selector('a[href*="/followers"] span')
-            if el:
-                text = el.inner_text().strip()
-                return self._parse_number(text)
-            return 0
+            followers = selector_registry.resolve(page, 'twitter', 'followers', self._parse_number, layout)
+            return followers or 0
         except:
             return 0
     
-    def _extract_following(self, page):
+    def _extract_following(self, page, layout=None):
         try:
-            el = page.query_selector('a[href*="/following"] span')
-            if el:
-                text = el.inner_text().strip()
-                return self._parse_number(text)
-            return 0
+            following = selector_registry.resolve(page, 'twitter', 'following', self._parse_number, layout)
+            return following or 0
         except:
             return 0
     
-    def _extract_tweet_urls(self, page):
-        urls = []
-        try:
-            links = page.query_selector_all('a[href*="/status/"]')
-            for link in links[:20]:
-                href = link.get_attribute('href')
-                if href:
-                    full_url = f'https://twitter.com{href}' if not href.startswith('http') else href
-                    urls.append(full_url)
-            return list(set(urls))
-        except:
-            return []
+    def _parse_count(self, text):
+        match = re.search(r'([\d,]+)', text)
+        if match:
+            return int(match.group(1).replace(',', ''))
+        return None
     
     def _parse_number(self, text):
         multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
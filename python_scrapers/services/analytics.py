@@ -0,0 +1,167 @@
+import re
+from collections import Counter
+import numpy as np
+
+SENTIMENT_KEYWORDS = {
+    'positive': ['amazing', 'great', 'awesome', 'best', 'love', 'excellent', 'fantastic', 'wonderful', 'perfect', 'good'],
+    'negative': ['bad', 'worst', 'terrible', 'awful', 'hate', 'poor', 'disappointing', 'waste', 'not worth', 'crowded']
+}
+
+TAG_PATTERN = re.compile(r'[#@]\w+')
+
+
+class KeywordTrie:
+    def __init__(self, words=None):
+        self.root = {}
+        for word in words or []:
+            self.add(word)
+
+    def add(self, word):
+        node = self.root
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def pattern(self):
+        return self._node_pattern(self.root)
+
+    def _node_pattern(self, node):
+        branches = [
+            re.escape(char) + self._node_pattern(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+
+
+class SentimentAnalyzer:
+    def __init__(self, keywords=None, top_n=20):
+        keywords = keywords or SENTIMENT_KEYWORDS
+        self.top_n = top_n
+        self.polarity = {}
+        for word in keywords['positive']:
+            self.polarity[word.lower()] = 1
+        for word in keywords['negative']:
+            self.polarity[word.lower()] = -1
+        self.keyword_pattern = re.compile(KeywordTrie(self.polarity).pattern())
+        self.keyword_pattern_nocase = re.compile(self.keyword_pattern.pattern, re.IGNORECASE)
+
+    def analyze(self, posts):
+        posts = [post for post in posts if isinstance(post, dict) and 'error' not in post]
+        n_posts = len(posts)
+
+        texts = [post.get('post_text') or '' for post in posts]
+        comment_counts = []
+        for post in posts:
+            comments = post.get('comments') or []
+            comment_counts.append(len(comments))
+            texts.extend((comment.get('text') or '') for comment in comments)
+
+        n_comments = len(texts) - n_posts
+        corpus = '\n'.join(texts)
+        starts = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        # Text n_posts + k is comment k; this maps any text back to its post.
+        post_starts = np.cumsum([0] + comment_counts[:-1]) + n_posts
+
+        keyword_owners, polarity = self._match_keywords(corpus, starts)
+        keyword_owners -= n_posts
+        in_comments = keyword_owners >= 0
+        keyword_owners = keyword_owners[in_comments]
+        polarity = polarity[in_comments]
+        positive_hits = np.bincount(keyword_owners[polarity > 0], minlength=n_comments)
+        negative_hits = np.bincount(keyword_owners[polarity < 0], minlength=n_comments)
+
+        has_positive = positive_hits > 0
+        has_negative = negative_hits > 0
+        is_positive = has_positive & ~has_negative
+        is_negative = has_negative & ~has_positive
+        scores = is_positive.astype(np.int8) - is_negative.astype(np.int8)
+
+        comment_posts = np.repeat(np.arange(n_posts), np.asarray(comment_counts, dtype=np.int64))
+        post_positive = np.bincount(comment_posts, weights=is_positive, minlength=n_posts)
+        post_negative = np.bincount(comment_posts, weights=is_negative, minlength=n_posts)
+        post_score = np.bincount(comment_posts, weights=scores, minlength=n_posts)
+
+        post_hashtags = [Counter() for _ in range(n_posts)]
+        post_mentions = [Counter() for _ in range(n_posts)]
+        tag_owners, tag_values = self._match_tags(corpus, starts)
+        if n_posts:
+            tag_posts = np.where(
+                tag_owners < n_posts,
+                tag_owners,
+                np.searchsorted(post_starts, tag_owners, side='right') - 1
+            )
+            for (post_index, tag), count in Counter(zip(tag_posts.tolist(), tag_values)).items():
+                if tag[0] == '#':
+                    post_hashtags[post_index][tag.lower()] += count
+                else:
+                    post_mentions[post_index][tag[1:]] += count
+
+        results = []
+        for i in range(n_posts):
+            results.append({
+                'url': posts[i].get('url'),
+                'sentiment': self._sentiment_summary(
+                    int(post_positive[i]), int(post_negative[i]), comment_counts[i], float(post_score[i])
+                ),
+                'hashtags': [tag for tag, _ in post_hashtags[i].most_common(self.top_n)],
+                'mentions': [mention for mention, _ in post_mentions[i].most_common(self.top_n)]
+            })
+
+        hashtags = Counter()
+        mentions = Counter()
+        for i in range(n_posts):
+            hashtags.update(post_hashtags[i])
+            mentions.update(post_mentions[i])
+
+        overall = self._sentiment_summary(
+            int(is_positive.sum()), int(is_negative.sum()), n_comments, float(scores.sum())
+        )
+        overall['top_hashtags'] = [{'tag': tag, 'count': count} for tag, count in hashtags.most_common(self.top_n)]
+        overall['top_mentions'] = [{'user': user, 'count': count} for user, count in mentions.most_common(self.top_n)]
+
+        return {'posts': results, 'overall': overall}
+
+    def _match_keywords(self, corpus, starts):
+        # Matching on the lowered corpus is much faster than IGNORECASE, but
+        # only safe when lowering keeps every character offset in place.
+        lowered = corpus.lower()
+        if len(lowered) == len(corpus):
+            matches = self.keyword_pattern.finditer(lowered)
+        else:
+            matches = self.keyword_pattern_nocase.finditer(corpus)
+
+        positions = []
+        values = []
+        for match in matches:
+            positions.append(match.start())
+            values.append(self.polarity[match.group().lower()])
+
+        owners = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side='right') - 1
+        return owners, np.asarray(values, dtype=np.int8)
+
+    def _match_tags(self, corpus, starts):
+        positions = []
+        values = []
+        for match in TAG_PATTERN.finditer(corpus):
+            positions.append(match.start())
+            values.append(match.group())
+
+        owners = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side='right') - 1
+        return owners, values
+
+    def _sentiment_summary(self, positive, negative, total, score):
+        return {
+            'positive': positive,
+            'negative': negative,
+            'neutral': total - positive - negative,
+            'total': total,
+            'positive_percentage': round(positive / total * 100, 2) if total > 0 else 0,
+            'negative_percentage': round(negative / total * 100, 2) if total > 0 else 0,
+            'score': round(score / total, 4) if total > 0 else 0
+        }
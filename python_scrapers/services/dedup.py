@@ -0,0 +1,267 @@
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+from config import config
+
+URL_PATTERN = re.compile(r'https?://\S+')
+WORD_PATTERN = re.compile(r'\w+')
+# Shingles hashed per NumPy pass; bounds the (num_perm x shingles) matrix to ~16 MB.
+CHUNK_SHINGLES = 1 << 16
+BATCH_SIZE = 4096
+EMPTY = -1
+
+
+def normalize_text(text):
+    return ' '.join(WORD_PATTERN.findall(URL_PATTERN.sub(' ', (text or '').lower())))
+
+
+class MinHasher:
+    def __init__(self, num_perm=32, shingle_size=4, min_length=12, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        # Multiply-shift hashing: ((a * x + b) mod 2^64) >> 32 with odd a.
+        self.a = rng.randint(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self.b = rng.randint(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text):
+        signatures, valid = self.signatures([text])
+        return signatures[0] if valid[0] else None
+
+    def signatures(self, texts):
+        # Returns one signature row per text and a mask of the texts long
+        # enough to be compared; shorter rows are left as zeros.
+        encoded = []
+        for text in texts:
+            text = normalize_text(text)
+            encoded.append(text.encode('utf-8') if len(text) >= self.min_length else b'')
+
+        signatures = np.zeros((len(encoded), self.num_perm), dtype=np.uint32)
+        valid = np.array([len(data) > 0 for data in encoded], dtype=bool)
+        chunk, shingles = [], 0
+        for index in np.flatnonzero(valid):
+            chunk.append(index)
+            shingles += len(encoded[index]) - self.shingle_size + 1
+            if shingles >= CHUNK_SHINGLES:
+                signatures[chunk] = self._minhash([encoded[i] for i in chunk])
+                chunk, shingles = [], 0
+        if chunk:
+            signatures[chunk] = self._minhash([encoded[i] for i in chunk])
+        return signatures, valid
+
+    def _minhash(self, encoded):
+        # Every text in the chunk is hashed in one pass over the joined bytes:
+        # each byte offset starts a k-byte shingle, offsets whose shingle would
+        # run into the next text are dropped, and minimum.reduceat takes the
+        # per-text minimum of each permutation along contiguous rows.
+        k = self.shingle_size
+        lengths = np.array([len(data) for data in encoded], dtype=np.int64)
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+        windows = len(data) - k + 1
+
+        shingles = np.zeros(windows, dtype=np.uint64)
+        for i in range(k):
+            shingles = (shingles << np.uint64(8)) | data[i:i + windows]
+        shingles ^= shingles >> np.uint64(32)
+        shingles &= np.uint64(0xffffffff)
+
+        starts = np.cumsum(lengths) - lengths
+        owner = np.repeat(np.arange(len(encoded)), lengths)[:windows]
+        shingles = shingles[np.arange(windows) - starts[owner] <= lengths[owner] - k]
+
+        counts = lengths - k + 1
+        hashed = self.a * shingles
+        hashed += self.b
+        hashed >>= np.uint64(32)
+        return np.minimum.reduceat(hashed, np.cumsum(counts) - counts, axis=1).T.astype(np.uint32)
+
+
+class DuplicateIndex:
+    def __init__(self, threshold=0.7, capacity=50000, num_perm=32, bands=8):
+        # Memory is fixed at construction: a ring of signature rows and band
+        # keys, plus one direct-mapped table per band holding the slot that
+        # first used each bucket. Evicted slots are detected by re-checking
+        # the stored band key, so nothing has to be removed from the tables.
+        self.threshold = threshold
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.signatures = np.zeros((capacity, num_perm), dtype=np.uint32)
+        self.band_keys = np.zeros((capacity, bands), dtype=np.uint64)
+        self.keys = [None] * capacity
+        # Four buckets per slot keeps collisions between live keys rare.
+        bits = max((4 * capacity - 1).bit_length(), 4)
+        self.shift = np.uint64(64 - bits)
+        self.tables = np.full((bands, 1 << bits), EMPTY, dtype=np.int32)
+        self.next_slot = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def check(self, key, text):
+        return self.check_many([key], [text])[0]
+
+    def check_many(self, keys, texts):
+        # Signatures, band keys and table lookups are computed per batch and
+        # only the lookup and insert hold the lock. Texts within a batch are
+        # matched against each other by exact band key rather than through
+        # the shared buckets, so results can differ from calling check() for
+        # each pair in order: another earlier copy may be named, and once the
+        # ring is nearly full, where buckets collide and slots are recycled,
+        # a borderline pair may be caught by one and missed by the other.
+        matches = []
+        step = min(BATCH_SIZE, self.capacity)
+        for start in range(0, len(keys), step):
+            batch_keys = keys[start:start + step]
+            signatures, valid = self.hasher.signatures(texts[start:start + step])
+            band_keys = self._band_keys(signatures)
+            with self.lock:
+                matches.extend(self._check_batch(batch_keys, signatures, band_keys, valid))
+        return matches
+
+    def _band_keys(self, signatures):
+        # FNV-1a over each band's rows; uint64 arithmetic wraps silently.
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = np.full((len(signatures), self.bands), 0xcbf29ce484222325, dtype=np.uint64)
+        keys ^= np.arange(self.bands, dtype=np.uint64)
+        for row in range(self.rows):
+            keys = (keys ^ bands[:, :, row]) * np.uint64(0x100000001b3)
+        return keys
+
+    def _check_batch(self, keys, signatures, band_keys, valid):
+        bands = np.arange(self.bands)
+        candidates = self.tables[bands, band_keys >> self.shift]
+        slots = np.where(candidates == EMPTY, 0, candidates)
+        hits = (candidates != EMPTY) & (self.band_keys[slots, bands] == band_keys)
+        hits &= (self.signatures[slots] == signatures[:, None, :]).mean(axis=2) >= self.threshold
+        first = np.where(hits.any(axis=1), slots[np.arange(len(keys)), hits.argmax(axis=1)], EMPTY).tolist()
+
+        # Texts are only written to the ring after the loop, so later texts
+        # in the batch are matched against earlier ones through pending, and
+        # a slot the batch is about to recycle no longer counts as a match.
+        matches = []
+        inserted = []
+        pending = {}
+        start = self.next_slot
+        for i, key in enumerate(keys):
+            if not valid[i]:
+                matches.append(None)
+                continue
+
+            match = None
+            slot = first[i]
+            if slot != EMPTY and (slot - start) % self.capacity >= len(inserted):
+                match = self.keys[slot]
+            elif slot != EMPTY:
+                kept = [slot for slot in slots[i, hits[i]].tolist() if (slot - start) % self.capacity >= len(inserted)]
+                match = self.keys[kept[0]] if kept else None
+            if match is None:
+                for band_key in band_keys[i].tolist():
+                    earlier = pending.get(band_key)
+                    if earlier is not None and (signatures[earlier] == signatures[i]).mean() >= self.threshold:
+                        match = keys[earlier]
+                        break
+
+            if match is not None:
+                matches.append(match if match != key else None)
+                continue
+            for band_key in band_keys[i].tolist():
+                pending.setdefault(band_key, i)
+            inserted.append(i)
+            matches.append(None)
+
+        if inserted:
+            self._insert([keys[i] for i in inserted], signatures[inserted], band_keys[inserted])
+        return matches
+
+    def _insert(self, keys, signatures, band_keys):
+        slots = (self.next_slot + np.arange(len(keys))) % self.capacity
+        self.next_slot = int(slots[-1] + 1) % self.capacity
+        self.size = min(self.size + len(keys), self.capacity)
+
+        # A bucket keeps the first slot that used it until that slot is
+        # recycled, or reused for a text whose band key lands elsewhere.
+        bands = np.arange(self.bands)
+        cells = (band_keys >> self.shift).astype(np.int64)
+        occupied = self.tables[bands, cells]
+        owners = np.where(occupied == EMPTY, 0, occupied)
+        free = (occupied == EMPTY) | np.isin(occupied, slots) | ((self.band_keys[owners, bands] >> self.shift).astype(np.int64) != cells)
+
+        for slot, key in zip(slots.tolist(), keys):
+            self.keys[slot] = key
+        self.signatures[slots] = signatures
+        self.band_keys[slots] = band_keys
+
+        rows, columns = np.nonzero(free)
+        # Within the batch the earliest text takes a shared bucket.
+        _, earliest = np.unique(columns * self.tables.shape[1] + cells[rows, columns], return_index=True)
+        rows, columns = rows[earliest], columns[earliest]
+        self.tables[columns, cells[rows, columns]] = slots[rows]
+
+
+class Deduplicator:
+    def __init__(self, settings=None):
+        self.settings = settings or config['dedup']
+        self.capacity = self.settings['capacity']
+        self.posts = DuplicateIndex(self.settings['threshold'], self.capacity)
+        self.comments = DuplicateIndex(self.settings['threshold'], self.capacity)
+        # URLs of posts last seen as a copy of another post, so crawls can
+        # skip mirrors without skipping the originals they point to.
+        self.mirror_urls = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_mirror(self, url):
+        with self.lock:
+            return url in self.mirror_urls
+
+    def process_post(self, post, collapse=False):
+        self._process([post], collapse)
+        return post
+
+    def process_posts(self, posts, collapse=False):
+        self._process(posts, collapse)
+        return [post for post in posts if not (collapse and 'duplicate_of' in post)]
+
+    def _process(self, posts, collapse):
+        # All post texts and all comments go through their index as one batch
+        # each, in the same order as checking post by post.
+        originals = self.posts.check_many(
+            [post.get('url') for post in posts], [post.get('post_text', '') for post in posts]
+        )
+        comments = [(post, comment) for post in posts for comment in post.get('comments') or []]
+        duplicates = self.comments.check_many(
+            # Keyed by author so re-scraping the same post is not a duplicate
+            # of itself, while copies from other accounts or posts are.
+            [f"{post.get('url')}#{comment.get('user', '')}" for post, comment in comments],
+            [comment.get('text', '') for _, comment in comments]
+        )
+
+        kept = {id(post): [] for post in posts}
+        for (post, comment), duplicate in zip(comments, duplicates):
+            if duplicate:
+                if collapse:
+                    continue
+                comment['duplicate_of'] = duplicate.rsplit('#', 1)[0]
+            kept[id(post)].append(comment)
+
+        for post, original in zip(posts, originals):
+            if original:
+                post['duplicate_of'] = original
+            if 'comments' in post:
+                post['comments'] = kept[id(post)]
+
+        with self.lock:
+            for post, original in zip(posts, originals):
+                url = post.get('url')
+                if not url:
+                    continue
+                if original:
+                    self.mirror_urls[url] = True
+                    self.mirror_urls.move_to_end(url)
+                else:
+                    # Its original was recycled, so the post now stands alone.
+                    self.mirror_urls.pop(url, None)
+            while len(self.mirror_urls) > self.capacity:
+                self.mirror_urls.popitem(last=False)
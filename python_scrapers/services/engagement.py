@@ -0,0 +1,144 @@
+import numpy as np
+
+# likes, comments, shares: the same weighted score the Node formatter uses
+WEIGHTS = np.array([1, 2, 3], dtype=np.int64)
+PERCENTILES = (50, 90, 99)
+
+
+def count(value):
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    try:
+        return max(int(value or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class EngagementAggregator:
+    def __init__(self, capacity=256):
+        # One row per post, appended as results arrive, so summaries are
+        # computed over these arrays instead of walking the post dicts again.
+        capacity = max(capacity, 1)
+        self.counts = np.zeros((capacity, 3), dtype=np.int64)
+        self.platform_codes = np.zeros(capacity, dtype=np.int32)
+        self.type_codes = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.platforms = {}
+        self.types = {}
+        self.rows = {}
+        self.followers = {}
+
+    @classmethod
+    def from_posts(cls, platform, posts, followers=None):
+        aggregator = cls(len(posts))
+        aggregator.add_posts(platform, posts)
+        if followers:
+            aggregator.add_followers(platform, followers)
+        return aggregator
+
+    def add(self, platform, post):
+        if self.size == len(self.active):
+            self._grow()
+
+        row = self.size
+        self.counts[row] = (count(post.get('likes')), count(post.get('comments')), count(post.get('shares')))
+        self.platform_codes[row] = self._code(self.platforms, platform)
+        self.type_codes[row] = self._code(self.types, post.get('post_type') or 'unknown')
+        self.active[row] = True
+        if post.get('url'):
+            self.rows[post['url']] = row
+        self.size += 1
+
+    def add_posts(self, platform, posts):
+        if not posts:
+            return
+        while self.size + len(posts) > len(self.active):
+            self._grow()
+
+        rows = slice(self.size, self.size + len(posts))
+        self.counts[rows] = [
+            (count(post.get('likes')), count(post.get('comments')), count(post.get('shares'))) for post in posts
+        ]
+        self.platform_codes[rows] = self._code(self.platforms, platform)
+        self.type_codes[rows] = [self._code(self.types, post.get('post_type') or 'unknown') for post in posts]
+        self.active[rows] = True
+        for row, post in enumerate(posts, self.size):
+            if post.get('url'):
+                self.rows[post['url']] = row
+        self.size += len(posts)
+
+    def add_followers(self, platform, followers):
+        self.followers[platform] = self.followers.get(platform, 0) + count(followers)
+
+    def discard(self, urls):
+        rows = [self.rows[url] for url in urls if url in self.rows]
+        self.active[rows] = False
+
+    def summary(self):
+        active = self.active[:self.size]
+        counts = self.counts[:self.size][active]
+        platforms = self.platform_codes[:self.size][active]
+        types = self.type_codes[:self.size][active]
+        scores = counts @ WEIGHTS
+
+        summary = self._summarize(counts, scores, types, None)
+        summary['platforms'] = {}
+        for platform, code in self.platforms.items():
+            mask = platforms == code
+            summary['platforms'][platform] = self._summarize(
+                counts[mask], scores[mask], types[mask], self.followers.get(platform, 0)
+            )
+        for platform in self.followers.keys() - self.platforms.keys():
+            summary['platforms'][platform] = self._summarize(counts[:0], scores[:0], types[:0], self.followers[platform])
+
+        # Each platform's rate is against its own followers; the overall rate
+        # is their mean weighted by post count. Platforms without a follower
+        # count (Reddit) are left out rather than counted as zero.
+        rated = [entry for entry in summary['platforms'].values() if entry['engagement_rate'] is not None]
+        posts = sum(entry['total_posts'] for entry in rated)
+        summary['engagement_rate'] = round(
+            sum(entry['engagement_rate'] * entry['total_posts'] for entry in rated) / posts, 4
+        ) if posts else None
+        return summary
+
+    def _summarize(self, counts, scores, types, followers):
+        posts = len(scores)
+        likes, comments, shares = (int(total) for total in counts.sum(axis=0))
+        type_counts = np.bincount(types, minlength=len(self.types))
+        percentiles = np.percentile(scores, PERCENTILES) if posts else np.zeros(len(PERCENTILES))
+
+        return {
+            'total_posts': posts,
+            'total_likes': likes,
+            'total_comments': comments,
+            'total_shares': shares,
+            'total_engagement': int(scores.sum()),
+            'avg_likes_per_post': round(likes / posts, 2) if posts else 0,
+            'avg_comments_per_post': round(comments / posts, 2) if posts else 0,
+            'avg_engagement_per_post': round(float(scores.mean()), 2) if posts else 0,
+            'percentiles': {f'p{q}': round(float(value), 2) for q, value in zip(PERCENTILES, percentiles)},
+            'engagement_rate': self._rate(counts, followers),
+            'post_types': {name: int(type_counts[code]) for name, code in self.types.items() if type_counts[code]}
+        }
+
+    def _rate(self, counts, followers):
+        # Average interactions per post as a percentage of followers, as in
+        # the Node formatter's per-post engagement_rate.
+        if not len(counts) or not followers:
+            return None
+        return round(float(counts.sum()) / len(counts) / followers * 100, 4)
+
+    def _code(self, codes, name):
+        if name not in codes:
+            codes[name] = len(codes)
+        return codes[name]
+
+    def _grow(self):
+        capacity = len(self.active) * 2
+        self.counts = np.resize(self.counts, (capacity, 3))
+        self.platform_codes = np.resize(self.platform_codes, capacity)
+        self.type_codes = np.resize(self.type_codes, capacity)
+        active = np.zeros(capacity, dtype=bool)
+        active[:self.size] = self.active[:self.size]
+        self.active = active
@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from config import config
+from utils.circuit_breaker import breakers
+from utils.scroll_crawler import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    def __init__(self, kind, platform, target, parent=None):
+        # kind is 'profile' or 'search' (discovery) or 'post' (depends on a discovery task)
+        self.kind = kind
+        self.platform = platform
+        self.target = target
+        self.parent = parent
+        self.status = 'pending'
+        self.error = None
+        self.started = None
+        self.seconds = None
+
+    @property
+    def discovery(self):
+        return self.kind != 'post'
+
+
+class EventPlanner:
+    def __init__(self, settings=None):
+        self.settings = settings or config['planner']
+        # Slots are shared by every event being crawled, so concurrent requests
+        # cannot together exceed the browser and connection budget.
+        self.slots = {
+            resource: threading.BoundedSemaphore(size) for resource, size in self.settings['budget'].items()
+        }
+        self.executor = ThreadPoolExecutor(max_workers=sum(self.settings['budget'].values()))
+        self.observed = {}
+        self.lock = threading.Lock()
+
+    def run(self, scrapers, event_name, event_date=None, platforms=(), social_links=None, deadline=None,
+            max_posts=None, skip_url=None, aggregator=None):
+        started = time.monotonic()
+        deadline_at = started + (deadline or self.settings['deadline'])
+        max_posts = max_posts or self.settings['max_posts']
+        since = parse_datetime(event_date)
+        until = since + timedelta(days=self.settings['window_days']) if since else None
+
+        tasks = []
+        ready = {resource: [] for resource in self.slots}
+        order = itertools.count()
+        planned_urls = set()
+
+        def schedule(task):
+            tasks.append(task)
+            if task.platform not in scrapers or task.platform not in self.settings['resources']:
+                task.status, task.error = 'skipped', f'Unsupported platform: {task.platform}'
+            elif task.kind == 'search' and task.platform not in self.settings['search_platforms']:
+                task.status, task.error = 'skipped', f'{task.platform} search not implemented'
+            else:
+                heapq.heappush(ready[self._resource(task)], (-self.expected_rate(task), next(order), task))
+
+        for platform, url in (social_links or {}).items():
+            schedule(Task('profile', platform.lower(), url))
+        for platform in platforms or []:
+            schedule(Task('search', platform.lower(), event_name))
+
+        posts = []
+        profiles = []
+        running = {}
+        while True:
+            for resource, heap in ready.items():
+                while heap and self.slots[resource].acquire(blocking=False):
+                    _, _, task = heapq.heappop(heap)
+                    if breakers.is_open(task.platform):
+                        self.slots[resource].release()
+                        task.status, task.error = 'skipped', f'{task.platform} circuit open'
+                        continue
+                    task.status = 'running'
+                    task.started = time.monotonic()
+                    running[self.executor.submit(self._execute, scrapers[task.platform], task, since, max_posts)] = task
+
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0 or not (running or any(ready.values())):
+                break
+            if not running:
+                # Every slot is held by another event's tasks; wait for one to free up.
+                time.sleep(min(remaining, self.settings['poll_seconds']))
+                continue
+
+            done, _ = wait(running, timeout=min(remaining, self.settings['poll_seconds']), return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                task.seconds = time.monotonic() - task.started
+                result = future.result()
+                if result.get('busy'):
+                    # Turned away by this worker's memory or page ceiling, not
+                    # by the platform, so it says nothing about the source.
+                    task.status, task.error = 'busy', result['error']
+                    continue
+                if 'error' in result:
+                    task.status, task.error = 'failed', result['error']
+                    self._observe(task, 0)
+                    continue
+                task.status = 'completed'
+
+                if not task.discovery:
+                    # Profile feeds are cut off at since while crawling, but
+                    # only the post itself says whether it is past until.
+                    # Scrapers leave timestamp empty when they could not read
+                    # it, so undated posts are kept rather than guessed at.
+                    posted = parse_datetime(result.get('timestamp'))
+                    if posted and ((since and posted < since) or (until and posted > until)):
+                        task.status = 'out_of_range'
+                        self._observe(task, 0)
+                        continue
+                    result['platform'] = task.platform
+                    posts.append(result)
+                    if aggregator is not None:
+                        aggregator.add(task.platform, result)
+                    self._observe(task, 1)
+                    continue
+
+                found = 0
+                for url in result.get('post_urls', [])[:max_posts]:
+                    if url in planned_urls or (skip_url and skip_url(url)):
+                        continue
+                    planned_urls.add(url)
+                    schedule(Task('post', task.platform, url, parent=task))
+                    found += 1
+                self._observe(task, found)
+                if task.kind == 'profile':
+                    profile = {key: value for key, value in result.items() if key not in ('posts', 'post_urls')}
+                    profiles.append({'platform': task.platform, 'url': task.target, **profile})
+                    if aggregator is not None:
+                        aggregator.add_followers(task.platform, profile.get('followers'))
+
+        # Anything still running keeps its slot until it finishes in the
+        # background; its result is simply not part of this response.
+        for task in tasks:
+            if task.status == 'pending':
+                task.status = 'not_started'
+            elif task.status == 'running':
+                task.status = 'timed_out'
+
+        logger.info(f'Event {event_name!r}: {len(posts)} posts from {len(tasks)} tasks in {time.monotonic() - started:.1f}s')
+        return {
+            'event_name': event_name,
+            'event_date': event_date,
+            'period': {
+                'start': since.isoformat() if since else None,
+                'end': until.isoformat() if until else None
+            },
+            'profiles': profiles,
+            'posts': posts,
+            'failed': [
+                {'kind': task.kind, 'platform': task.platform, 'target': task.target, 'error': task.error}
+                for task in tasks if task.status in ('failed', 'skipped', 'busy') and task.discovery
+            ],
+            'tasks': dict(Counter(task.status for task in tasks)),
+            'partial': any(task.status in ('not_started', 'timed_out', 'busy') for task in tasks),
+            'elapsed': round(time.monotonic() - started, 3)
+        }
+
+    def expected_rate(self, task):
+        # Expected posts (or post links, for discovery) per second of work, so
+        # cheap high-yield sources are started first within each budget.
+        kind = 'discover' if task.discovery else 'post'
+        with self.lock:
+            found, seconds = self.observed.get(
+                (task.platform, kind), self.settings['priors'][self._resource(task)][kind]
+            )
+        return found / max(seconds, 0.1)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                f'{platform}.{kind}': {'found': round(found, 2), 'seconds': round(seconds, 2)}
+                for (platform, kind), (found, seconds) in self.observed.items()
+            }
+
+    def _observe(self, task, found):
+        kind = 'discover' if task.discovery else 'post'
+        alpha = self.settings['smoothing']
+        with self.lock:
+            previous = self.observed.get((task.platform, kind))
+            if previous is None:
+                self.observed[(task.platform, kind)] = (found, task.seconds)
+            else:
+                self.observed[(task.platform, kind)] = (
+                    previous[0] + alpha * (found - previous[0]),
+                    previous[1] + alpha * (task.seconds - previous[1])
+                )
+
+    def _resource(self, task):
+        return self.settings['resources'][task.platform]
+
+    def _execute(self, scraper, task, since, max_posts):
+        try:
+            if task.kind == 'profile':
+                return breakers.guard(
+                    task.platform, scraper.scrape_profile, task.target,
+                    max_posts=max_posts, since=since, scrape_posts=False
+                )
+            if task.kind == 'search':
+                return breakers.guard(
+                    task.platform, scraper.search_posts, task.target, max_posts, since=since, scrape_posts=False
+                )
+            return breakers.guard(task.platform, scraper.scrape_post, task.target)
+        except Exception as e:
+            return {'error': str(e)}
+        finally:
+            self.slots[self._resource(task)].release()
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from config import config
+from utils.scroll_crawler import parse_datetime
+
+POST_ID_PATTERNS = {
+    'instagram': re.compile(r'/(?:p|reel)/([^/?#]+)'),
+    'twitter': re.compile(r'/status/(\d+)'),
+    'linkedin': re.compile(r'activity[-:](\d+)|/posts/([^/?#]+)'),
+    'reddit': re.compile(r'/comments/([a-z0-9]+)')
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS posts (
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    author TEXT,
+    post_text TEXT,
+    post_type TEXT,
+    event_name TEXT,
+    posted_at TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (platform, post_id)
+);
+CREATE INDEX IF NOT EXISTS posts_event_posted ON posts (event_name, posted_at);
+CREATE INDEX IF NOT EXISTS posts_posted ON posts (posted_at);
+
+CREATE TABLE IF NOT EXISTS comments (
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    comment_key TEXT NOT NULL,
+    user TEXT,
+    text TEXT,
+    likes INTEGER,
+    commented_at TEXT,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (platform, post_id, comment_key)
+);
+
+CREATE TABLE IF NOT EXISTS engagement_snapshots (
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    captured_at TEXT NOT NULL,
+    likes INTEGER NOT NULL,
+    comments INTEGER NOT NULL,
+    shares INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_post_captured ON engagement_snapshots (platform, post_id, captured_at);
+'''
+
+# Upserting refreshes the mutable fields but keeps first_seen, and never lets a
+# scrape without an event name or post date wipe the one recorded earlier. A
+# date from a later scrape wins, since an earlier one may have missed it.
+UPSERT_POST = '''
+INSERT INTO posts (platform, post_id, url, author, post_text, post_type, event_name, posted_at, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (platform, post_id) DO UPDATE SET
+    url = excluded.url,
+    author = COALESCE(NULLIF(excluded.author, ''), posts.author),
+    post_text = COALESCE(NULLIF(excluded.post_text, ''), posts.post_text),
+    post_type = COALESCE(excluded.post_type, posts.post_type),
+    event_name = COALESCE(NULLIF(excluded.event_name, ''), posts.event_name),
+    posted_at = COALESCE(excluded.posted_at, posts.posted_at),
+    last_seen = excluded.last_seen
+'''
+
+INSERT_COMMENT = '''
+INSERT OR IGNORE INTO comments (platform, post_id, comment_key, user, text, likes, commented_at, first_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_SNAPSHOT = '''
+INSERT INTO engagement_snapshots (platform, post_id, captured_at, likes, comments, shares)
+VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def post_id(platform, url):
+    pattern = POST_ID_PATTERNS.get(platform)
+    match = pattern.search(url) if pattern else None
+    if match:
+        return next(group for group in match.groups() if group)
+    return url.split('#')[0].split('?')[0].rstrip('/')
+
+
+def to_utc(value):
+    parsed = parse_datetime(value)
+    return parsed.astimezone(timezone.utc).isoformat() if parsed else None
+
+
+def to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class SQLiteSink:
+    def __init__(self, path=None):
+        self.path = path or config['sink']['path']
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.local = threading.local()
+        # SQLite has a single writer anyway; serializing here avoids busy retries.
+        self.write_lock = threading.Lock()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def write(self, platform, posts, event_name=''):
+        now = datetime.now(timezone.utc).isoformat()
+        post_rows, comment_rows, snapshot_rows = [], [], []
+
+        for post in posts:
+            if not post.get('url') or 'error' in post:
+                continue
+            key = post_id(platform, post['url'])
+            comments = post.get('comments') or []
+            post_rows.append((
+                platform, key, post['url'], post.get('author'), post.get('post_text'), post.get('post_type'),
+                event_name or post.get('event_name') or '', to_utc(post.get('timestamp')), now, now
+            ))
+            snapshot_rows.append((platform, key, now, to_int(post.get('likes')), len(comments), to_int(post.get('shares'))))
+            for comment in comments:
+                user = comment.get('user') or ''
+                text = comment.get('text') or ''
+                comment_key = hashlib.sha1(f'{user}\x00{text}'.encode('utf-8')).hexdigest()[:16]
+                comment_rows.append((
+                    platform, key, comment_key, user, text, to_int(comment.get('likes')),
+                    to_utc(comment.get('timestamp')), now
+                ))
+
+        if not post_rows:
+            return 0
+
+        with self.write_lock, self._connection() as connection:
+            connection.executemany(UPSERT_POST, post_rows)
+            connection.executemany(INSERT_COMMENT, comment_rows)
+            connection.executemany(INSERT_SNAPSHOT, snapshot_rows)
+        return len(post_rows)
+
+    def query(self, event_name=None, platform=None, since=None, until=None, limit=100, offset=0,
+              include_comments=False):
+        clauses, params = [], []
+        if event_name:
+            clauses.append('p.event_name = ?')
+            params.append(event_name)
+        if platform:
+            clauses.append('p.platform = ?')
+            params.append(platform)
+        # Posts without a parseable timestamp fall back to when they were first scraped.
+        if since:
+            clauses.append('COALESCE(p.posted_at, p.first_seen) >= ?')
+            params.append(to_utc(since))
+        if until:
+            clauses.append('COALESCE(p.posted_at, p.first_seen) < ?')
+            params.append(to_utc(until))
+
+        sql = f'''
+            SELECT p.*, s.likes, s.comments AS comments_count, s.shares, s.captured_at
+            FROM posts p LEFT JOIN engagement_snapshots s
+                ON s.rowid = (SELECT rowid FROM engagement_snapshots
+                              WHERE platform = p.platform AND post_id = p.post_id
+                              ORDER BY captured_at DESC LIMIT 1)
+            {'WHERE ' + ' AND '.join(clauses) if clauses else ''}
+            ORDER BY COALESCE(p.posted_at, p.first_seen) DESC
+            LIMIT ? OFFSET ?
+        '''
+        connection = self._connection()
+        posts = [dict(row) for row in connection.execute(sql, params + [limit, offset])]
+
+        if include_comments and posts:
+            by_key = {(post['platform'], post['post_id']): post for post in posts}
+            for post in posts:
+                post['comments'] = []
+            placeholders = ','.join('(?, ?)' for _ in by_key)
+            rows = connection.execute(
+                f'''SELECT * FROM comments WHERE (platform, post_id) IN (VALUES {placeholders})
+                    ORDER BY commented_at''',
+                [value for key in by_key for value in key]
+            )
+            for row in rows:
+                comment = dict(row)
+                by_key[(comment.pop('platform'), comment.pop('post_id'))]['comments'].append(comment)
+        return posts
+
+    def engagement_history(self, platform, key, since=None, until=None):
+        sql = 'SELECT captured_at, likes, comments, shares FROM engagement_snapshots WHERE platform = ? AND post_id = ?'
+        params = [platform, key]
+        if since:
+            sql += ' AND captured_at >= ?'
+            params.append(to_utc(since))
+        if until:
+            sql += ' AND captured_at < ?'
+            params.append(to_utc(until))
+        return [dict(row) for row in self._connection().execute(sql + ' ORDER BY captured_at', params)]
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from config import config
+from utils.lifecycle import lifecycle
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserStateManager:
+    def __init__(self, root=None, slots=None, max_age=None):
+        settings = config['browser_state']
+        self.root = root or settings['dir']
+        self.slots = slots or settings['slots']
+        self.max_age = max_age or settings['max_age']
+        self.lock = threading.Lock()
+        # (platform, slot) -> open lock file held while the profile is in use
+        self.in_use = {}
+
+    @contextmanager
+    def open_context(self, playwright, platform, user_agent):
+        lifecycle.admit()
+        try:
+            slot = self._acquire_slot(platform)
+
+            # Every persistent profile for this platform is busy (or nested inside
+            # another scrape), so fall back to a throwaway context seeded with the
+            # last saved cookies and localStorage.
+            if slot is None:
+                browser = playwright.chromium.launch(headless=True)
+                context = None
+                try:
+                    context = browser.new_context(user_agent=user_agent, storage_state=self._load_state(platform))
+                    lifecycle.track_context(context, platform)
+                    yield context
+                    self._save_state(platform, context)
+                finally:
+                    if context is not None:
+                        lifecycle.release_context(context)
+                    browser.close()
+                return
+
+            try:
+                profile_dir = self._profile_dir(platform, slot)
+                fresh = self._prepare_profile(profile_dir)
+                context = playwright.chromium.launch_persistent_context(
+                    profile_dir,
+                    headless=True,
+                    user_agent=user_agent
+                )
+                lifecycle.track_context(context, platform)
+                try:
+                    if fresh:
+                        self._seed_cookies(platform, context)
+                    yield context
+                    self._save_state(platform, context)
+                finally:
+                    lifecycle.release_context(context)
+                    context.close()
+            finally:
+                self._release_slot(platform, slot)
+        finally:
+            lifecycle.release_browser()
+
+    def warm_up(self, platforms, user_agent=None):
+        from playwright.sync_api import sync_playwright
+
+        user_agent = user_agent or config['scraping']['user_agent']
+        urls = config['browser_state']['warm_up_urls']
+
+        with sync_playwright() as p:
+            for platform in platforms:
+                if platform not in urls:
+                    continue
+                try:
+                    started = time.time()
+                    with self.open_context(p, platform, user_agent) as context:
+                        page = lifecycle.new_page(context)
+                        try:
+                            page.goto(urls[platform], wait_until='domcontentloaded', timeout=30000)
+                            self._dismiss_consent(page)
+                        finally:
+                            lifecycle.close_page(page)
+                    logger.info(f'Warmed up {platform} browser state in {time.time() - started:.1f}s')
+                except Exception as e:
+                    logger.warning(f'Warm-up failed for {platform}: {str(e)}')
+
+    def _acquire_slot(self, platform):
+        with self.lock:
+            for slot in range(self.slots):
+                if (platform, slot) in self.in_use:
+                    continue
+                lock_file = self._lock_slot(platform, slot)
+                if lock_file is not None:
+                    self.in_use[(platform, slot)] = lock_file
+                    return slot
+        return None
+
+    def _release_slot(self, platform, slot):
+        with self.lock:
+            lock_file = self.in_use.pop((platform, slot), None)
+        if lock_file is not None:
+            # Closing the file drops the flock.
+            lock_file.close()
+
+    def _lock_slot(self, platform, slot):
+        # Gunicorn workers and the reloader's child each have their own
+        # in_use, so a profile is also claimed with a flock that other
+        # processes see. It lives beside the profile because rotation
+        # deletes the profile directory itself.
+        path = f'{self._profile_dir(platform, slot)}.lock'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(path, 'a')
+        except OSError as e:
+            logger.warning(f'Could not open {path}: {str(e)}')
+            return None
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _profile_dir(self, platform, slot):
+        return os.path.join(self.root, platform, f'profile-{slot}')
+
+    def _state_file(self, platform):
+        return os.path.join(self.root, platform, 'storage_state.json')
+
+    def _is_stale(self, created):
+        return time.time() - created > self.max_age
+
+    def _prepare_profile(self, profile_dir):
+        marker = os.path.join(profile_dir, '.created')
+        try:
+            with open(marker) as f:
+                created = float(f.read().strip())
+        except (OSError, ValueError):
+            created = None
+
+        if created is not None and not self._is_stale(created):
+            return False
+
+        # The profile holds cookies, localStorage, the service-worker cache and
+        # the HTTP disk cache, so rotating it drops all of them together.
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        os.makedirs(profile_dir, exist_ok=True)
+        with open(marker, 'w') as f:
+            f.write(str(time.time()))
+        return True
+
+    def _read_state_file(self, platform):
+        try:
+            with open(self._state_file(platform)) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self._is_stale(saved.get('created', 0)):
+            return None
+        return saved
+
+    def _load_state(self, platform):
+        saved = self._read_state_file(platform)
+        return saved['state'] if saved else None
+
+    def _save_state(self, platform, context):
+        try:
+            saved = self._read_state_file(platform)
+            created = saved['created'] if saved else time.time()
+            state = context.storage_state()
+
+            path = self._state_file(platform)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'created': created, 'state': state}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f'Could not save {platform} browser state: {str(e)}')
+
+    def _seed_cookies(self, platform, context):
+        state = self._load_state(platform)
+        if state and state.get('cookies'):
+            try:
+                context.add_cookies(state['cookies'])
+            except Exception as e:
+                logger.warning(f'Could not seed {platform} cookies: {str(e)}')
+
+    def _dismiss_consent(self, page):
+        for selector in config['browser_state']['consent_selectors']:
+            try:
+                button = page.query_selector(selector)
+                if button:
+                    button.click(timeout=2000)
+                    page.wait_for_load_state('networkidle', timeout=5000)
+                    return
+            except Exception:
+                continue
+
+
+browser_state = BrowserStateManager()
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import deque
+from config import config
+from utils.lifecycle import CapacityError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def classify(result):
+    if not isinstance(result, dict):
+        return 'error'
+
+    if 'error' in result:
+        return 'timeout' if 'timeout' in str(result['error']).lower() else 'error'
+
+    # The extract helpers swallow their own exceptions, so a login wall or a
+    # block page comes back as an empty post rather than an error.
+    if 'post_text' in result and not result.get('post_text', '').strip() \
+            and not result.get('comments') and not result.get('likes'):
+        return 'empty'
+
+    return 'ok'
+
+
+class CircuitBreaker:
+    def __init__(self, name, settings=None):
+        self.name = name
+        self.settings = settings or config['circuit_breaker']
+        self.outcomes = deque(maxlen=self.settings['window'])
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.time() - self.opened_at < self.settings['open_seconds']:
+                    return False
+                self.state = HALF_OPEN
+                self.probes_in_flight = 0
+                self.probe_successes = 0
+                logger.info(f'Circuit for {self.name} is half-open, probing')
+
+            if self.probes_in_flight < self.settings['half_open_max_calls']:
+                self.probes_in_flight += 1
+                return True
+            return False
+
+    def is_open(self):
+        with self.lock:
+            return self.state == OPEN and time.time() - self.opened_at < self.settings['open_seconds']
+
+    def record(self, outcome, probe=True):
+        with self.lock:
+            if self.state == HALF_OPEN:
+                if probe:
+                    self.probes_in_flight = max(self.probes_in_flight - 1, 0)
+                if outcome == 'ok':
+                    self.probe_successes += 1
+                    if self.probe_successes >= self.settings['half_open_successes']:
+                        self.state = CLOSED
+                        self.outcomes.clear()
+                        logger.info(f'Circuit for {self.name} closed')
+                else:
+                    self._open()
+                return
+
+            if self.state == OPEN:
+                return
+
+            self.outcomes.append(outcome)
+            if len(self.outcomes) >= self.settings['min_calls'] and self._failure_rate() >= self.settings['failure_rate']:
+                self._open()
+
+    def release(self):
+        # Gives back a half-open probe without counting the call either way.
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.probes_in_flight = max(self.probes_in_flight - 1, 0)
+
+    def snapshot(self):
+        with self.lock:
+            total = len(self.outcomes)
+            snapshot = {
+                'state': self.state,
+                'calls': total,
+                'error_rate': round(self._failure_rate(), 3),
+                'timeout_rate': round(self.outcomes.count('timeout') / total, 3) if total else 0
+            }
+            if self.state == OPEN:
+                snapshot['retry_after'] = max(round(self.opened_at + self.settings['open_seconds'] - time.time(), 1), 0)
+            return snapshot
+
+    def _failure_rate(self):
+        if not self.outcomes:
+            return 0
+        return sum(1 for outcome in self.outcomes if outcome != 'ok') / len(self.outcomes)
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.probes_in_flight = 0
+        logger.warning(f'Circuit for {self.name} opened')
+
+
+class CircuitBreakers:
+    def __init__(self):
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get(self, platform):
+        with self.lock:
+            if platform not in self.breakers:
+                self.breakers[platform] = CircuitBreaker(platform)
+            return self.breakers[platform]
+
+    def is_open(self, platform):
+        return self.get(platform).is_open()
+
+    def record(self, platform, result):
+        self.get(platform).record(classify(result), probe=False)
+
+    def guard(self, platform, fn, *args, **kwargs):
+        breaker = self.get(platform)
+        if not breaker.allow():
+            return {
+                'error': f'{platform} is temporarily unavailable (circuit open)',
+                'circuit_open': True,
+                'retry_after': breaker.snapshot().get('retry_after', 0)
+            }
+
+        try:
+            result = fn(*args, **kwargs)
+        except CapacityError as e:
+            # This worker is out of memory or pages; that says nothing about
+            # the platform, so the call is not counted against its circuit.
+            breaker.release()
+            return {'error': str(e), 'busy': True}
+        except Exception:
+            breaker.record('error')
+            raise
+        breaker.record(classify(result))
+        return result
+
+    def snapshot(self):
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+breakers = CircuitBreakers()
@@ -0,0 +1,283 @@
+import heapq
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from config import config
+
+
+class HedgeCancelled(Exception):
+    pass
+
+
+def is_timeout(error):
+    import requests
+
+    return isinstance(error, (requests.Timeout, TimeoutError)) or type(error).__name__ == 'TimeoutError'
+
+
+_captured = threading.local()
+
+
+def _install_socket_capture():
+    # requests.get() opens a fresh connection per call, so remembering the
+    # sockets a hedged attempt creates lets the winner abort the loser even
+    # while it is still blocked waiting for response headers.
+    from urllib3.util import connection
+
+    if getattr(connection.create_connection, 'captures_sockets', False):
+        return
+    original = connection.create_connection
+
+    def create_connection(*args, **kwargs):
+        sock = original(*args, **kwargs)
+        sockets = getattr(_captured, 'sockets', None)
+        if sockets is not None:
+            sockets.append(sock)
+        return sock
+
+    create_connection.captures_sockets = True
+    connection.create_connection = create_connection
+
+
+class _HedgeRace:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.hedge_done = threading.Event()
+        self.first_sockets = []
+        self.hedge_sockets = []
+        self.first_finished = False
+        self.hedge_started = False
+        self.won = False
+        self.result = None
+        self.error = None
+
+    def start_hedge(self):
+        with self.lock:
+            if self.first_finished or self.won:
+                return False
+            self.hedge_started = True
+            return True
+
+    def finish_first(self):
+        with self.lock:
+            self.first_finished = True
+            return not self.hedge_started
+
+    def claim(self, loser_sockets):
+        with self.lock:
+            if self.won:
+                return False
+            self.won = True
+            self.first_finished = True
+        self.cancelled.set()
+        for sock in loser_sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return True
+
+
+class LatencyTracker:
+    def __init__(self, settings=None):
+        self.settings = settings or config['latency']
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.settings['hedge_workers'])
+        self.hedges_in_flight = 0
+        self.timers = threading.Condition()
+        self.timer_queue = []
+        self.timer_order = itertools.count()
+        self.timer_thread = None
+
+    def record(self, platform, url, seconds, operation='request'):
+        domain = urlparse(url or '').netloc
+        with self.lock:
+            # Samples go to both the domain and the platform-wide bucket so a
+            # new domain can borrow platform statistics until it has its own.
+            for key in ((platform, domain, operation), (platform, '*', operation)):
+                if key not in self.samples:
+                    self.samples[key] = deque(maxlen=self.settings['window'])
+                self.samples[key].append(seconds)
+
+    def percentile(self, platform, url, q, operation='request'):
+        domain = urlparse(url or '').netloc
+        with self.lock:
+            for key in ((platform, domain, operation), (platform, '*', operation)):
+                samples = self.samples.get(key)
+                if samples and len(samples) >= self.settings['min_samples']:
+                    ordered = sorted(samples)
+                    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+        return None
+
+    def timeout(self, platform, url, operation='request'):
+        budget = self.settings['timeouts'][operation]
+        p99 = self.percentile(platform, url, 0.99, operation)
+        if p99 is None:
+            return budget
+        return min(max(p99 * self.settings['multiplier'], self.settings['min_timeouts'][operation]), budget)
+
+    def measure(self, platform, url, operation, fn):
+        timeout = self.timeout(platform, url, operation)
+        started = time.perf_counter()
+        try:
+            result = fn(timeout)
+        except Exception as e:
+            # A timeout is a censored sample: the real latency was at least the budget.
+            if is_timeout(e):
+                self.record(platform, url, timeout, operation)
+            raise
+        self.record(platform, url, time.perf_counter() - started, operation)
+        return result
+
+    def goto(self, page, platform, url, **kwargs):
+        return self.measure(platform, url, 'navigation', lambda timeout: page.goto(url, timeout=timeout * 1000, **kwargs))
+
+    def wait_for_selector(self, page, platform, selector, **kwargs):
+        return self.measure(
+            platform, page.url, 'selector',
+            lambda timeout: page.wait_for_selector(selector, timeout=timeout * 1000, **kwargs)
+        )
+
+    def get(self, platform, url, hedge=None, **kwargs):
+        if hedge is None:
+            hedge = self.settings['hedge']
+
+        hedge_after = self.percentile(platform, url, 0.95) if hedge else None
+        if hedge_after is None:
+            return self.measure(platform, url, 'request', lambda timeout: self._fetch(url, timeout, kwargs))
+
+        # Idempotent GETs only. The first attempt runs on the calling thread;
+        # if it is still going after p95, a second one is raced against it on
+        # the pool and whichever finishes first aborts the other.
+        _install_socket_capture()
+        race = _HedgeRace()
+        timeout = self.timeout(platform, url)
+        self._schedule(hedge_after, lambda: self._launch_hedge(race, platform, url, timeout, kwargs))
+
+        _captured.sockets = race.first_sockets
+        started = time.perf_counter()
+        response, error = None, None
+        try:
+            response = self._timed_fetch(platform, url, timeout, kwargs, race.cancelled)
+        except Exception as e:
+            error = e
+        finally:
+            _captured.sockets = None
+
+        if response is not None and race.claim(race.hedge_sockets):
+            return response
+
+        if race.finish_first():
+            # No hedge was started, so the first attempt's outcome stands.
+            if response is None:
+                raise error
+            return response
+
+        # Lost to, or failed while racing, a hedge that is already running.
+        race.hedge_done.wait()
+        if race.result is not None:
+            # The aborted first attempt never got a sample of its own. Count it
+            # as censored at the time the caller waited, at least p95 plus the
+            # hedge's latency, or the window would only keep the fast hedges.
+            if response is None and not is_timeout(error):
+                self.record(platform, url, time.perf_counter() - started)
+            return race.result
+        raise error or race.error
+
+    def _launch_hedge(self, race, platform, url, timeout, kwargs):
+        with self.lock:
+            # A saturated pool means the hedge would only queue, so skip it
+            # rather than let hedging add latency.
+            if self.hedges_in_flight >= self.settings['hedge_workers'] or not race.start_hedge():
+                return
+            self.hedges_in_flight += 1
+        self.executor.submit(self._run_hedge, race, platform, url, timeout, kwargs)
+
+    def _run_hedge(self, race, platform, url, timeout, kwargs):
+        _captured.sockets = race.hedge_sockets
+        try:
+            response = self._timed_fetch(platform, url, timeout, kwargs, race.cancelled)
+            if race.claim(race.first_sockets):
+                race.result = response
+        except Exception as e:
+            race.error = e
+        finally:
+            _captured.sockets = None
+            with self.lock:
+                self.hedges_in_flight -= 1
+            race.hedge_done.set()
+
+    def _schedule(self, delay, callback):
+        with self.timers:
+            heapq.heappush(self.timer_queue, (time.monotonic() + delay, next(self.timer_order), callback))
+            if self.timer_thread is None:
+                self.timer_thread = threading.Thread(target=self._run_timers, daemon=True)
+                self.timer_thread.start()
+            self.timers.notify()
+
+    def _run_timers(self):
+        # One thread fires every pending hedge instead of a Timer thread per request.
+        while True:
+            with self.timers:
+                while not self.timer_queue or self.timer_queue[0][0] > time.monotonic():
+                    self.timers.wait(self.timer_queue[0][0] - time.monotonic() if self.timer_queue else None)
+                _, _, callback = heapq.heappop(self.timer_queue)
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def snapshot(self):
+        with self.lock:
+            keys = [key for key in self.samples if key[1] == '*']
+        stats = {}
+        for platform, _, operation in keys:
+            p50 = self.percentile(platform, None, 0.5, operation)
+            stats.setdefault(platform, {})[operation] = {
+                'p50': round(p50, 3) if p50 is not None else None,
+                'timeout': round(self.timeout(platform, None, operation), 3)
+            }
+        return stats
+
+    def _timed_fetch(self, platform, url, timeout, kwargs, cancelled):
+        started = time.perf_counter()
+        try:
+            response = self._fetch(url, timeout, kwargs, cancelled)
+        except Exception as e:
+            if is_timeout(e):
+                self.record(platform, url, timeout)
+            raise
+        self.record(platform, url, time.perf_counter() - started)
+        return response
+
+    def _fetch(self, url, timeout, kwargs, cancelled=None):
+        # Imported here so loading this module stays cheap for browser-only workers.
+        import requests
+
+        if cancelled is None:
+            return requests.get(url, timeout=timeout, **kwargs)
+
+        response = requests.get(url, timeout=timeout, stream=True, **kwargs)
+        chunks = []
+        try:
+            for chunk in response.iter_content(64 * 1024):
+                if cancelled.is_set():
+                    raise HedgeCancelled(url)
+                chunks.append(chunk)
+        finally:
+            response.close()
+
+        # Mirror what requests does for a non-streamed response so callers can
+        # keep using .content, .text and .json() as usual.
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+        return response
+
+
+latency = LatencyTracker()
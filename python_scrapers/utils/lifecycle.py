@@ -0,0 +1,249 @@
+import gc
+import logging
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from config import config
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_NAMES = ('chrome', 'chromium', 'headless_shell')
+MB = 1024 * 1024
+
+
+class CapacityError(Exception):
+    pass
+
+
+def _read_proc(pid, name):
+    try:
+        with open(f'/proc/{pid}/{name}', 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def rss_bytes(pid='self'):
+    status = _read_proc(pid, 'status')
+    if status is None:
+        return None
+    for line in status.splitlines():
+        if line.startswith(b'VmRSS:'):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+def process_table():
+    # pid -> (ppid, cmdline); empty where /proc is not available.
+    table = {}
+    try:
+        pids = [int(entry) for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return table
+
+    for pid in pids:
+        stat = _read_proc(pid, 'stat')
+        cmdline = _read_proc(pid, 'cmdline')
+        if stat is None or cmdline is None:
+            continue
+        # The command name in stat may contain spaces, so fields are counted
+        # from its closing parenthesis.
+        ppid = int(stat[stat.rindex(b')') + 2:].split()[1])
+        table[pid] = (ppid, cmdline.replace(b'\0', b' ').decode('utf-8', 'replace'))
+    return table
+
+
+def descendants(table, root):
+    children = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+
+    found = []
+    stack = [root]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def is_chromium(cmdline):
+    executable = os.path.basename(cmdline.split(' ', 1)[0]).lower()
+    return any(name in executable for name in CHROMIUM_NAMES)
+
+
+class PageLifecycle:
+    def __init__(self, settings=None):
+        self.settings = settings or config['lifecycle']
+        self.page_slots = threading.BoundedSemaphore(self.settings['max_pages'])
+        self.browser_slots = threading.BoundedSemaphore(self.settings['max_browsers'])
+        self.browsers = 0
+        self.contexts = {}
+        self.pages = {}
+        self.counters = Counter()
+        self.condition = threading.Condition()
+
+    def admit(self):
+        # Called before a browser is launched; on success the caller holds a
+        # browser slot until it calls release_browser(). Over the memory
+        # ceiling, first reap anything leaked, then wait for running scrapes
+        # to close their browsers before giving up.
+        deadline = time.monotonic() + self.settings['admit_wait']
+        while self._over_ceiling():
+            self.recycle()
+            if not self._over_ceiling():
+                break
+            with self.condition:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['rejected'] += 1
+                    raise CapacityError(f'Worker memory is above {self.settings["memory_ceiling_mb"]} MB')
+                self.condition.wait(min(remaining, 1))
+
+        # Taken before launch, so scrapes beyond the limit wait without a
+        # Chromium of their own instead of idling in new_page().
+        if not self.browser_slots.acquire(timeout=self.settings['page_wait']):
+            with self.condition:
+                self.counters['rejected'] += 1
+            raise CapacityError(f'More than {self.settings["max_browsers"]} browsers are open in this worker')
+        with self.condition:
+            self.browsers += 1
+
+    def release_browser(self):
+        with self.condition:
+            self.browsers -= 1
+            self.condition.notify_all()
+        self.browser_slots.release()
+
+    def track_context(self, context, platform):
+        with self.condition:
+            self.contexts[context] = {'platform': platform, 'opened': time.time(), 'pages': set()}
+            self.counters['contexts_opened'] += 1
+
+    def release_context(self, context):
+        with self.condition:
+            entry = self.contexts.pop(context, None)
+            leaked = [page for page in entry['pages'] if self.pages.pop(page, None) is not None] if entry else []
+            self.counters['pages_leaked'] += len(leaked)
+            self.condition.notify_all()
+
+        for page in leaked:
+            self.page_slots.release()
+            try:
+                page.close()
+            except Exception:
+                pass
+        if leaked:
+            logger.warning(f'{len(leaked)} {entry["platform"]} page(s) were still open when their context closed')
+
+    def new_page(self, context):
+        if not self.page_slots.acquire(timeout=self.settings['page_wait']):
+            self.counters['rejected'] += 1
+            raise CapacityError(f'More than {self.settings["max_pages"]} pages are open in this worker')
+        try:
+            page = context.new_page()
+        except Exception:
+            self.page_slots.release()
+            raise
+
+        with self.condition:
+            self.pages[page] = context
+            if context in self.contexts:
+                self.contexts[context]['pages'].add(page)
+            self.counters['pages_opened'] += 1
+        return page
+
+    def close_page(self, page):
+        with self.condition:
+            context = self.pages.pop(page, None)
+            if context in self.contexts:
+                self.contexts[context]['pages'].discard(page)
+            tracked = context is not None
+            self.condition.notify_all()
+
+        if tracked:
+            self.page_slots.release()
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def recycle(self):
+        reaped = self._reap_orphans()
+        gc.collect()
+        with self.condition:
+            self.counters['recycles'] += 1
+            self.counters['chromium_reaped'] += reaped
+
+    def memory(self):
+        table = process_table()
+        worker = rss_bytes()
+        if worker is None:
+            return None
+
+        chromium = [pid for pid in descendants(table, os.getpid()) if is_chromium(table[pid][1])]
+        chromium_rss = sum(rss_bytes(pid) or 0 for pid in chromium)
+        return {
+            'worker_rss_mb': round(worker / MB, 1),
+            'chromium_processes': len(chromium),
+            'chromium_rss_mb': round(chromium_rss / MB, 1),
+            'total_rss_mb': round((worker + chromium_rss) / MB, 1)
+        }
+
+    def snapshot(self):
+        with self.condition:
+            handles = {
+                'browsers': self.browsers,
+                'contexts': len(self.contexts),
+                'pages': len(self.pages),
+                'oldest_context_seconds': round(max(
+                    (time.time() - entry['opened'] for entry in self.contexts.values()), default=0
+                ), 1)
+            }
+            counters = dict(self.counters)
+
+        try:
+            handles['file_descriptors'] = len(os.listdir('/proc/self/fd'))
+        except OSError:
+            pass
+        handles['threads'] = threading.active_count()
+
+        return {
+            'memory': self.memory(),
+            'ceiling_mb': self.settings['memory_ceiling_mb'],
+            'max_pages': self.settings['max_pages'],
+            'max_browsers': self.settings['max_browsers'],
+            'open': handles,
+            'counters': counters
+        }
+
+    def _over_ceiling(self):
+        memory = self.memory()
+        return memory is not None and memory['total_rss_mb'] > self.settings['memory_ceiling_mb']
+
+    def _reap_orphans(self):
+        # A browser whose Playwright driver died is re-parented to init and
+        # keeps its memory forever. Only browsers using one of our profile
+        # directories (or Playwright's temporary ones) are touched.
+        table = process_table()
+        ours = set(descendants(table, os.getpid()))
+        markers = (config['browser_state']['dir'], 'playwright_chromiumdev_profile')
+        reaped = 0
+        for pid, (ppid, cmdline) in table.items():
+            if ppid != 1 or pid in ours or not is_chromium(cmdline):
+                continue
+            if '--user-data-dir=' not in cmdline or not any(marker in cmdline for marker in markers):
+                continue
+            try:
+                os.kill(pid, signal.SIGKILL)
+                reaped += 1
+            except OSError:
+                continue
+        if reaped:
+            logger.warning(f'Killed {reaped} orphaned Chromium process(es)')
+        return reaped
+
+
+lifecycle = PageLifecycle()
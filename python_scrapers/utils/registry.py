@@ -0,0 +1,46 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRegistry:
+    def __init__(self, entries):
+        self.entries = dict(entries)
+        self.instances = {}
+        self.load_times = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def get(self, name):
+        instance = self.instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self.lock:
+            if name not in self.instances:
+                module_name, class_name = self.entries[name]
+                started = time.perf_counter()
+                module = importlib.import_module(module_name)
+                self.instances[name] = getattr(module, class_name)()
+                self.load_times[name] = round(time.perf_counter() - started, 4)
+                logger.info(f'Loaded {class_name} in {self.load_times[name]}s')
+            return self.instances[name]
+
+    def prewarm(self, names):
+        for name in names:
+            if name in self.entries:
+                self.get(name)
+
+    def loaded(self):
+        return dict(self.load_times)
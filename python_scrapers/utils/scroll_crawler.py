@@ -0,0 +1,136 @@
+import logging
+from datetime import datetime, timezone
+from dateutil import parser as date_parser
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Installed once per page. A MutationObserver harvests matching links as the
+# feed renders them, so nothing is missed between scroll steps and no
+# query_selector_all round trip is needed per step.
+OBSERVER_SCRIPT = '''(options) => {
+    if (window.__evlensHarvest) return;
+    const pattern = new RegExp(options.pattern);
+    const queue = [];
+    const seen = new Set();
+
+    const harvest = (root) => {
+        const anchors = root.matches && root.matches('a[href]') ? [root] : [];
+        anchors.push(...root.querySelectorAll('a[href]'));
+        for (const anchor of anchors) {
+            const match = anchor.href.match(pattern);
+            if (!match || seen.has(match[1])) continue;
+            seen.add(match[1]);
+            const container = options.container ? anchor.closest(options.container) : null;
+            const time = container ? container.querySelector('time') : null;
+            queue.push({url: match[1], datetime: time ? time.getAttribute('datetime') : null});
+        }
+    };
+
+    harvest(document);
+    new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                if (node.nodeType === 1) harvest(node);
+            }
+        }
+    }).observe(document.body, {childList: true, subtree: true});
+
+    window.__evlensHarvest = {
+        drain: () => queue.splice(0),
+        // Empties containers that are far above the viewport but keeps their
+        // height, so the DOM stays small without the scroll position jumping.
+        prune: (viewports) => {
+            if (!options.prune || !options.container) return 0;
+            let pruned = 0;
+            for (const element of document.querySelectorAll(options.container)) {
+                if (element.dataset.evlensPruned) continue;
+                const rect = element.getBoundingClientRect();
+                if (rect.bottom < -viewports * window.innerHeight) {
+                    element.style.height = rect.height + 'px';
+                    element.replaceChildren();
+                    element.dataset.evlensPruned = '1';
+                    pruned++;
+                }
+            }
+            return pruned;
+        }
+    };
+}'''
+
+
+def parse_datetime(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        # Scrapers mostly produce ISO strings, which parse far faster natively.
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            try:
+                parsed = date_parser.parse(value)
+            except (ValueError, OverflowError):
+                return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class ScrollCrawler:
+    def __init__(self, settings=None):
+        self.settings = settings or config['crawler']
+
+    def crawl(self, page, platform, max_items=None, since=None, skip_url=None):
+        definition = self.settings['platforms'][platform]
+        max_items = max_items or self.settings['max_posts']
+        since = parse_datetime(since)
+
+        page.evaluate(OBSERVER_SCRIPT, {
+            'pattern': definition['pattern'],
+            'container': definition.get('container'),
+            'prune': definition.get('prune', True)
+        })
+
+        urls = []
+        seen = set()
+        idle_scrolls = 0
+        older_in_a_row = 0
+        for _ in range(self.settings['max_scrolls']):
+            found = 0
+            for item in page.evaluate('() => window.__evlensHarvest.drain()'):
+                url = item['url']
+                if url in seen:
+                    continue
+                seen.add(url)
+                found += 1
+
+                # Feeds are newest-first apart from pinned posts, so only stop
+                # once several posts in a row fall before the cutoff.
+                posted = parse_datetime(item.get('datetime'))
+                if since and posted and posted < since:
+                    older_in_a_row += 1
+                    continue
+                older_in_a_row = 0
+
+                if skip_url and skip_url(url):
+                    continue
+                urls.append(url)
+                if len(urls) >= max_items:
+                    return urls
+
+            if since and older_in_a_row >= self.settings['cutoff_patience']:
+                break
+
+            idle_scrolls = 0 if found else idle_scrolls + 1
+            if idle_scrolls >= self.settings['max_idle_scrolls']:
+                break
+
+            page.evaluate('(viewports) => window.__evlensHarvest.prune(viewports)', self.settings['prune_after_viewports'])
+            page.mouse.wheel(0, self.settings['scroll_step'])
+            page.wait_for_timeout(self.settings['scroll_pause_ms'])
+
+        logger.info(f'Harvested {len(urls)} {platform} post links from {len(seen)} seen')
+        return urls
+
+
+scroll_crawler = ScrollCrawler()
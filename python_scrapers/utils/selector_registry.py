@@ -0,0 +1,132 @@
+import logging
+import threading
+import zlib
+from collections import OrderedDict, deque
+from config import config
+from scrapers.selector_definitions import SELECTORS
+
+logger = logging.getLogger(__name__)
+
+# Reads every matching element in one protocol round trip instead of one
+# inner_text()/get_attribute() call per element.
+READ_SCRIPT = '''(elements, options) => elements.slice(0, options.limit).map(
+    element => options.attribute ? element.getAttribute(options.attribute) : element.innerText
+)'''
+
+# Structural outline of the page (tags, roles and test ids, no generated class
+# names) used to remember which selector worked for a given layout.
+FINGERPRINT_SCRIPT = '''() => {
+    const parts = [];
+    const walk = (element, depth) => {
+        if (depth > 3 || parts.length > 300) return;
+        for (const child of element.children) {
+            parts.push(depth + child.tagName + (child.getAttribute('role') || '') + (child.getAttribute('data-testid') || ''));
+            walk(child, depth + 1);
+        }
+    };
+    if (document.body) walk(document.body, 0);
+    return parts.join('|');
+}'''
+
+
+class SelectorRegistry:
+    def __init__(self, definitions=None, settings=None):
+        self.definitions = definitions or SELECTORS
+        self.settings = settings or config['selectors']
+        self.stats = {}
+        self.winners = OrderedDict()
+        self.reported_dead = set()
+        self.lock = threading.Lock()
+
+    def fingerprint(self, page):
+        try:
+            return format(zlib.crc32(page.evaluate(FINGERPRINT_SCRIPT).encode('utf-8')), '08x')
+        except Exception:
+            return None
+
+    def ordered(self, platform, field, layout=None):
+        selectors = self.definitions[platform][field]['selectors']
+        with self.lock:
+            # Smoothed hit rate keeps the declared order until there is data.
+            ranked = sorted(selectors, key=lambda selector: -self._hit_rate(platform, field, selector))
+            winner = self.winners.get((platform, field, layout))
+        if winner in ranked:
+            ranked.remove(winner)
+            ranked.insert(0, winner)
+        return ranked
+
+    def resolve(self, page, platform, field, parse=None, layout=None):
+        definition = self.definitions[platform][field]
+        options = {
+            'attribute': definition.get('attribute'),
+            'limit': definition.get('limit', self.settings['max_elements'])
+        }
+
+        for selector in self.ordered(platform, field, layout):
+            for value in page.eval_on_selector_all(selector, READ_SCRIPT, options):
+                value = (value or '').strip()
+                if not value:
+                    continue
+                parsed = parse(value) if parse else value
+                if parsed is not None:
+                    self.record(platform, field, selector, True, layout)
+                    return parsed
+            self.record(platform, field, selector, False, layout)
+        return None
+
+    def record(self, platform, field, selector, hit, layout=None):
+        key = (platform, field, selector)
+        with self.lock:
+            # Lifetime totals for the report, the last `window` outcomes for
+            # ranking, and the misses since the last hit for dead detection,
+            # so a selector that stops matching after a long run is noticed.
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = [0, 0, deque(maxlen=self.settings['window']), 0]
+            stats[0] += 1
+            stats[1] += 1 if hit else 0
+            stats[2].append(hit)
+            stats[3] = 0 if hit else stats[3] + 1
+            misses = stats[3]
+            if hit:
+                self.reported_dead.discard(key)
+
+            if hit and layout is not None:
+                self.winners[(platform, field, layout)] = selector
+                self.winners.move_to_end((platform, field, layout))
+                if len(self.winners) > self.settings['max_layouts']:
+                    self.winners.popitem(last=False)
+
+            if misses >= self.settings['dead_after'] and key not in self.reported_dead:
+                self.reported_dead.add(key)
+                logger.warning(f'Selector {selector!r} for {platform}.{field} has not matched in its last {misses} attempts')
+
+    def report(self):
+        with self.lock:
+            stats = {key: (attempts, hits, sum(recent) / len(recent), misses)
+                     for key, (attempts, hits, recent, misses) in self.stats.items()}
+
+        report = {}
+        dead = []
+        for (platform, field, selector), (attempts, hits, recent_rate, misses) in stats.items():
+            report.setdefault(platform, {}).setdefault(field, []).append({
+                'selector': selector,
+                'attempts': attempts,
+                'hits': hits,
+                'hit_rate': round(recent_rate, 3)
+            })
+            if misses >= self.settings['dead_after']:
+                dead.append({'platform': platform, 'field': field, 'selector': selector, 'misses': misses})
+
+        for fields in report.values():
+            for entries in fields.values():
+                entries.sort(key=lambda entry: -entry['hit_rate'])
+        return {'selectors': report, 'dead': dead}
+
+    def _hit_rate(self, platform, field, selector):
+        stats = self.stats.get((platform, field, selector))
+        recent = stats[2] if stats else ()
+        return (sum(recent) + 1) / (len(recent) + 2)
+
+
+selector_registry = SelectorRegistry()
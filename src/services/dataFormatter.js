@@ -94,7 +94,7 @@ const dataFormatter = {
     return likes + (comments * 2) + (shares * 3);
   },
 
-  format(rawData, url, platform, eventName) {
+  format(rawData, url, platform, eventName, analytics = rawData.analytics) {
     const baseFormat = {
       url,
       platform,
@@ -119,7 +119,9 @@ const dataFormatter = {
       shares: this.parseNumber(rawData.shares || rawData.retweets || 0),
       timestamp: rawData.timestamp || rawData.created_at || new Date().toISOString(),
       engagement: this.calculateEngagement(rawData),
-      sentiment_data: this.extractSentimentData(rawData.comments || []),
+      sentiment_data: analytics
+        ? this.sentimentFromSummary(analytics.sentiment)
+        : this.extractSentimentData(rawData.comments || []),
       metadata: {
         author: rawData.author || rawData.username || 'Unknown',
         post_type: rawData.post_type || 'post',
@@ -169,6 +171,9 @@ const dataFormatter = {
   },
 
   formatProfile(rawData, profileUrl, platform, eventName) {
+    const analytics = rawData.analytics;
+    const postAnalytics = new Map((analytics?.posts || []).map(entry => [entry.url, entry]));
+
     return {
       profile_url: profileUrl,
       platform,
@@ -181,9 +186,15 @@ const dataFormatter = {
         following: this.parseNumber(rawData.following || 0),
         posts_count: this.parseNumber(rawData.posts_count || 0)
       },
-      posts: (rawData.posts || []).map(post => this.format(post, post.url || profileUrl, platform, eventName)),
-      overall_sentiment: this.calculateOverallSentiment(rawData.posts || []),
-      engagement_metrics: this.calculateProfileEngagement(rawData.posts || [])
+      posts: (rawData.posts || []).map(post => this.format(
+        post, post.url || profileUrl, platform, eventName, post.analytics || postAnalytics.get(post.url)
+      )),
+      overall_sentiment: analytics
+        ? this.overallSentimentFromSummary(analytics.overall)
+        : this.calculateOverallSentiment(rawData.posts || []),
+      engagement_metrics: rawData.engagement
+        ? this.profileEngagementFromSummary(rawData.engagement)
+        : this.calculateProfileEngagement(rawData.posts || [])
     };
   },
 
@@ -292,6 +303,41 @@ const dataFormatter = {
     };
   },
 
+  // The Python service scores all comments in one pass while scraping, so
+  // its analytics replace the keyword scan over every comment here.
+  sentimentFromSummary(summary) {
+    return {
+      positive: summary.positive,
+      negative: summary.negative,
+      neutral: summary.neutral,
+      total: summary.total
+    };
+  },
+
+  overallSentimentFromSummary(summary) {
+    return {
+      ...this.sentimentFromSummary(summary),
+      positive_percentage: summary.total > 0 ? summary.positive_percentage.toFixed(2) : 0,
+      negative_percentage: summary.total > 0 ? summary.negative_percentage.toFixed(2) : 0
+    };
+  },
+
+  // The Python service already aggregates engagement as posts are scraped,
+  // so reuse its summary instead of walking the posts again.
+  profileEngagementFromSummary(summary) {
+    return {
+      total_posts: summary.total_posts,
+      total_likes: summary.total_likes,
+      total_comments: summary.total_comments,
+      total_shares: summary.total_shares,
+      avg_likes_per_post: summary.total_posts > 0 ? summary.avg_likes_per_post.toFixed(2) : 0,
+      avg_comments_per_post: summary.total_posts > 0 ? summary.avg_comments_per_post.toFixed(2) : 0,
+      total_engagement: summary.total_engagement,
+      engagement_percentiles: summary.percentiles,
+      engagement_rate: summary.engagement_rate
+    };
+  },
+
   calculateProfileEngagement(posts) {
     let totalLikes = 0;
     let totalComments = 0;